@@ -0,0 +1,166 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.BatchingAdvisor import BatchingAdvisor
+from Advisors.CachingAdvisor import CachingAdvisor
+from Advisors.OpenAIAdvisor import OpenAIAdvisor
+from Advisors.RoutingAdvisor import RoutingAdvisor, Route
+from Advisors.SharedCacheAdvisor import SharedCacheAdvisor, make_namespace
+from Advisors.SharedStores import create_store
+
+ROUTE_SECTION_PREFIX = "route."
+PROFILE_SECTION_PREFIX = "profile."
+DRAFT_SECTION = "draft"
+SHARED_CACHE_SECTION = "shared_cache"
+PROBE_SECTION = "probe"
+SHARED_READERS = 8
+SHARED_WRITERS = 2
+
+# 共享存储及其线程池在所有建议提供者之间复用，配置变化时重建
+_shared_store = None
+
+
+def get_profile_names(config) -> List[str]:
+    """启用的提示词风格，未配置时只使用settings中的提示词"""
+    names = [n.strip() for n in config.get("settings", "profiles", fallback="").split(",") if n.strip()]
+    for name in names:
+        if not config.has_section(PROFILE_SECTION_PREFIX + name):
+            logging.warning(f"未找到风格配置 [{PROFILE_SECTION_PREFIX}{name}]，已忽略")
+    return [n for n in names if config.has_section(PROFILE_SECTION_PREFIX + n)]
+
+
+def get_profile_title(config, name: str) -> str:
+    return config.get(PROFILE_SECTION_PREFIX + name, "title", fallback=name)
+
+
+def get_endpoints(config, extra: Optional[str] = None) -> List[str]:
+    """参与测速的接入点：openai中配置的接入点加上probe中列出（或extra临时指定）的网关或镜像"""
+    endpoints = [config.get("openai", "endpoint", fallback="")]
+    if extra is None:
+        extra = config.get(PROBE_SECTION, "endpoints", fallback="")
+    for endpoint in extra.split(","):
+        if endpoint.strip() and endpoint.strip() not in endpoints:
+            endpoints.append(endpoint.strip())
+    return endpoints
+
+
+def get_endpoint(config) -> str:
+    """开启自动选择时使用测速选出的最快接入点"""
+    endpoint = config.get("openai", "endpoint")
+    if config.getboolean(PROBE_SECTION, "auto_select", fallback=False):
+        selected = config.get(PROBE_SECTION, "selected_endpoint", fallback="")
+        if selected and selected in get_endpoints(config):
+            endpoint = selected
+    return endpoint
+
+
+def get_shared_store(config):
+    """返回(存储, 查询线程池, 写入线程池)，未启用或创建失败时返回None"""
+    global _shared_store
+    settings = tuple(config.get(SHARED_CACHE_SECTION, key, fallback="")
+                     for key in ("backend", "url", "path", "connect_timeout_sec"))
+    if _shared_store is not None and _shared_store[0] == settings:
+        return _shared_store[1]
+
+    shared = None
+    try:
+        store = create_store(config, max_idle=SHARED_READERS + SHARED_WRITERS)
+        if store is not None:
+            shared = (store,
+                      ThreadPoolExecutor(max_workers=SHARED_READERS, thread_name_prefix="shared-cache-read"),
+                      ThreadPoolExecutor(max_workers=SHARED_WRITERS, thread_name_prefix="shared-cache-write"))
+    except Exception as e:
+        logging.error(f"创建共享缓存失败，仅使用本机缓存: {str(e)}")
+    if _shared_store is not None and _shared_store[1] is not None:
+        for executor in _shared_store[1][1:]:
+            executor.shutdown(wait=False)
+    _shared_store = (settings, shared)
+    return shared
+
+
+def create_model_advisor(config, section="openai", prompt=None, batch_window_ms=None, shared=True) -> AdvisorInterface:
+    """创建单个模型的建议提供者，未配置的项沿用openai和settings中的值"""
+    model = config.get(section, "model", fallback=None) or config.get("openai", "model")
+    prompt = prompt or config.get(section, "prompt", fallback=None) or config.get("settings", "prompt")
+    advisor = OpenAIAdvisor(
+        config.get("openai", "api_key"),
+        model,
+        config.getfloat(section, "temperature", fallback=config.getfloat("openai", "temperature", fallback=0.7)),
+        get_endpoint(config),
+        prompt,
+        max_tokens=config.getint(section, "max_tokens", fallback=500),
+        candidates=config.getint("settings", "candidates", fallback=5),
+    )
+
+    # 合并窗口默认关闭，单独一次按键不必等待；引擎有并发客户端时再传入窗口
+    advisor = BatchingAdvisor(
+        advisor,
+        window_ms=batch_window_ms if batch_window_ms is not None
+        else config.getfloat("settings", "batch_window_ms", fallback=0),
+        max_batch=config.getint("settings", "batch_max_size", fallback=8),
+        max_chars=config.getint("settings", "batch_max_chars", fallback=80),
+    )
+
+    # 回放、压测等场景传入shared=False，避免把测试结果写进团队共享缓存
+    shared = get_shared_store(config) if shared else None
+    if shared is not None:
+        store, readers, writers = shared
+        advisor = SharedCacheAdvisor(
+            advisor, store, readers, writers, make_namespace(model, prompt),
+            timeout_ms=config.getfloat(SHARED_CACHE_SECTION, "timeout_ms", fallback=80),
+            ttl_sec=config.getint(SHARED_CACHE_SECTION, "ttl_sec", fallback=30 * 24 * 3600),
+            backoff_sec=config.getfloat(SHARED_CACHE_SECTION, "backoff_sec", fallback=30),
+        )
+    return advisor
+
+
+def create_route(config, name: str, prompt=None, batch_window_ms=None, shared=True) -> Route:
+    section = ROUTE_SECTION_PREFIX + name
+    languages = config.get(section, "languages", fallback="")
+    return Route(
+        name,
+        create_model_advisor(config, section, prompt, batch_window_ms, shared),
+        min_tokens=config.getint(section, "min_input_tokens", fallback=0),
+        max_tokens=config.getint(section, "max_input_tokens", fallback=0),
+        languages=languages.split(",") if languages else None,
+        code=config.get(section, "code", fallback="any"),
+        max_latency_ms=config.getfloat(section, "max_latency_ms", fallback=0),
+    )
+
+
+def create_cache(config, advisor: AdvisorInterface) -> CachingAdvisor:
+    return CachingAdvisor(advisor, max_entries=config.getint("settings", "cache_size", fallback=256))
+
+
+def get_profile_prompt(config, profile=None):
+    return config.get(PROFILE_SECTION_PREFIX + profile, "prompt", fallback=None) if profile else None
+
+
+def create_draft_advisor(config, cache=True, profile=None, batch_window_ms=None, shared=True) -> AdvisorInterface:
+    """渐进模式下先给出草稿的快速模型，不经过路由"""
+    advisor = create_model_advisor(config, DRAFT_SECTION, get_profile_prompt(config, profile), batch_window_ms, shared)
+    if cache:
+        advisor = create_cache(config, advisor)
+    return advisor
+
+
+def create_advisor(config, cache=True, profile=None, batch_window_ms=None, shared=True) -> AdvisorInterface:
+    """根据配置组装建议提供者，指定风格时所有模型都使用该风格的提示词"""
+    prompt = get_profile_prompt(config, profile)
+    advisor = create_model_advisor(config, prompt=prompt, batch_window_ms=batch_window_ms, shared=shared)
+
+    route_names = [n.strip() for n in config.get("router", "routes", fallback="").split(",") if n.strip()]
+    if route_names:
+        routes = []
+        for name in route_names:
+            if not config.has_section(ROUTE_SECTION_PREFIX + name):
+                logging.warning(f"未找到路由配置 [{ROUTE_SECTION_PREFIX}{name}]，已忽略")
+                continue
+            routes.append(create_route(config, name, prompt, batch_window_ms, shared))
+        advisor = RoutingAdvisor(routes, Route("default", advisor))
+
+    if cache:
+        advisor = create_cache(config, advisor)
+    return advisor
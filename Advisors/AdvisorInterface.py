@@ -5,4 +5,8 @@ class AdvisorInterface(metaclass=ABCMeta):
 
     @abstractmethod
     def get_text_suggestions(self, text) -> Optional[List[str]]:
-        pass
\ No newline at end of file
+        pass
+
+    def get_stats(self) -> dict:
+        """运行统计，用于诊断"""
+        return {}
\ No newline at end of file
@@ -0,0 +1,137 @@
+import json
+import logging
+import threading
+from typing import Optional, List, Dict
+
+from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.OpenAIAdvisor import OpenAIAdvisor
+
+BATCH_PROMPT = ("下面的JSON数组包含多段待处理的文本，请对其中每一段文本分别完成以下任务：\n\n"
+                "{task}\n\n"
+                "只返回一个JSON对象，键为文本的id，值为该文本的建议列表（字符串数组），不要输出其他内容。\n\n"
+                "{items}")
+
+
+class _PendingRequest:
+    def __init__(self, request_id: str, text: str):
+        self.request_id = request_id
+        self.text = text
+        self.done = threading.Event()
+        self.result: Optional[List[str]] = None
+
+
+# 把等待窗口内的多条短文本合并成一次API调用
+class BatchingAdvisor(AdvisorInterface):
+
+    def __init__(self, advisor: OpenAIAdvisor, window_ms=30, max_batch=8, max_chars=80, item_tokens=200):
+        self.advisor = advisor
+        self.window = max(float(window_ms), 0) / 1000
+        self.max_batch = max(int(max_batch), 1)
+        self.max_chars = int(max_chars)
+        self.item_tokens = int(item_tokens)
+        self._lock = threading.Lock()
+        self._pending: List[_PendingRequest] = []
+        self._timer = None
+        self._next_id = 0
+        self.batched_calls = 0
+        self.batched_requests = 0
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        if self.window <= 0 or self.max_batch < 2 or len(text) > self.max_chars:
+            return self.advisor.get_text_suggestions(text)
+
+        batch = None
+        with self._lock:
+            self._next_id += 1
+            request = _PendingRequest(str(self._next_id), text)
+            self._pending.append(request)
+            if len(self._pending) >= self.max_batch:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            self._dispatch(batch)
+
+        request.done.wait()
+        if request.result is None:
+            # 批量结果无法解析时退回单独调用
+            return self.advisor.get_text_suggestions(text)
+        return request.result
+
+    def get_stats(self) -> dict:
+        return {
+            "batch_pending": len(self._pending),
+            "batched_calls": self.batched_calls,
+            "batched_requests": self.batched_requests,
+        }
+
+    def _take_pending(self) -> List[_PendingRequest]:
+        """取出当前等待中的请求，调用方需持有锁"""
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_PendingRequest]):
+        try:
+            if len(batch) == 1:
+                # 只有一条时没有合并的必要，由请求线程自行调用
+                return
+
+            results = self._request_batch(batch)
+            for request in batch:
+                lines = results.get(request.request_id)
+                if lines:
+                    request.result = self.advisor.finalize(request.text, lines) or lines[:self.advisor.max_suggestions]
+
+            self.batched_calls += 1
+            self.batched_requests += len(batch)
+            logging.info(f"批量请求: {len(batch)} 条文本合并为 1 次调用，"
+                         f"解析成功 {sum(1 for r in batch if r.result)} 条")
+        except Exception as e:
+            logging.warning(f"批量请求失败，退回单独调用: {str(e)}")
+            for request in batch:
+                request.result = None
+        finally:
+            for request in batch:
+                request.done.set()
+
+    def _request_batch(self, batch: List[_PendingRequest]) -> Dict[str, List[str]]:
+        task = self.advisor.build_prompt("（见下方JSON中每一项的text字段）")
+        items = json.dumps([{"id": r.request_id, "text": r.text} for r in batch], ensure_ascii=False)
+        prompt = BATCH_PROMPT.format(task=task, items=items)
+
+        content = self.advisor.complete(prompt, max_tokens=self.item_tokens * len(batch))
+        return self.parse_batch_response(content)
+
+    @staticmethod
+    def parse_batch_response(content: str) -> Dict[str, List[str]]:
+        """解析批量回复，跳过格式不正确的条目"""
+        # 模型可能在JSON外包裹代码块标记，只截取最外层的对象
+        start, end = content.find("{"), content.rfind("}")
+        if start < 0 or end < start:
+            raise ValueError("批量回复中没有JSON对象")
+
+        data = json.loads(content[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("批量回复格式不正确")
+        results = {}
+        for key, value in data.items():
+            if isinstance(value, str):
+                value = OpenAIAdvisor.parse_suggestions(value)
+            if not isinstance(value, list):
+                continue
+            suggestions = [str(s).strip() for s in value if str(s).strip()]
+            if suggestions:
+                results[str(key)] = suggestions
+        return results
@@ -0,0 +1,63 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, List
+
+from Advisors.AdvisorInterface import AdvisorInterface
+
+SPACES_PATTERN = re.compile(r"[^\S\n]+")
+BLANK_LINES_PATTERN = re.compile(r"\n\s*\n+")
+
+
+def normalize_text(text: str) -> str:
+    """统一Unicode组合形式并合并多余空白，不改变文本的实际内容"""
+    text = unicodedata.normalize("NFC", text)
+    text = SPACES_PATTERN.sub(" ", text)
+    text = BLANK_LINES_PATTERN.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+
+def cache_key(text: str) -> str:
+    """缓存键忽略全角半角、大小写和空白差异"""
+    return unicodedata.normalize("NFKC", normalize_text(text)).casefold()
+
+
+# 本地LRU缓存，相同文本不再重复请求
+class CachingAdvisor(AdvisorInterface):
+
+    def __init__(self, advisor: AdvisorInterface, max_entries=256):
+        self.advisor = advisor
+        self.max_entries = int(max_entries)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, text: str) -> Optional[List[str]]:
+        """只查缓存，不触发请求"""
+        key = cache_key(text)
+        with self._lock:
+            suggestions = self._entries.get(key)
+            if suggestions is not None:
+                self._entries.move_to_end(key)
+            return suggestions
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        suggestions = self.peek(text)
+        if suggestions is not None:
+            self.hits += 1
+            return suggestions
+
+        self.misses += 1
+        suggestions = self.advisor.get_text_suggestions(text)
+        if suggestions and self.max_entries > 0:
+            with self._lock:
+                self._entries[cache_key(text)] = suggestions
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return suggestions
+
+    def get_stats(self) -> dict:
+        return dict(self.advisor.get_stats(), cache_entries=len(self._entries), cache_hits=self.hits,
+                    cache_misses=self.misses)
@@ -0,0 +1,28 @@
+import logging
+from typing import Optional, List
+
+from Advisors.AdvisorInterface import AdvisorInterface
+
+
+# 通过常驻引擎进程获取建议，引擎不可用时退回本进程内的建议提供者
+class EngineAdvisor(AdvisorInterface):
+
+    def __init__(self, client, fallback: AdvisorInterface, profile=None, draft=False):
+        self.client = client
+        self.fallback = fallback
+        self.profile = profile
+        self.draft = draft
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        try:
+            return self.client.get_text_suggestions(text, self.profile, self.draft)
+        except (ConnectionError, FileNotFoundError) as e:
+            logging.warning(f"连接建议引擎失败，改为本地调用: {str(e)}")
+            return self.fallback.get_text_suggestions(text)
+
+    def get_stats(self) -> dict:
+        try:
+            return {"engine": self.client.get_stats()}
+        except (OSError, ValueError) as e:
+            return {"engine_error": str(e), "local": self.fallback.get_stats()}
+
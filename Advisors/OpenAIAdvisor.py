@@ -1,9 +1,23 @@
 import logging
+import re
 from typing import Optional, List
 
 import openai
 
 from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.SuggestionRanker import rank_suggestions
+
+SYSTEM_PROMPT = "你是一个专业的写作助手。"
+CANDIDATES_HINT = "\n\n请给出{count}个彼此不同的选项，每个选项占一行。"
+COUNT_PLACEHOLDER = "<count>"
+# 提示词中已写明选项数量时不再追加，避免给模型两个矛盾的数量
+# 只看修饰选项、建议等词的数量，“一个专业编辑”这类普通用法和数字一都不算
+STATED_COUNT_PATTERN = re.compile(
+    r"(?<![\d一])([2-9]|\d{2,}|[两三四五六七八九十])\s*[种个条][^，。,.\n]{0,15}?(选项|建议|表达|方式|改写|版本|说法|句子)"
+    r"|\b([2-9]|\d{2,}|two|three|four|five|six|seven|eight|nine|ten)\s+(\w+\s+){0,2}?"
+    r"(options?|suggestions?|alternatives?|versions?|rewrites?|ways?)\b",
+    re.IGNORECASE
+)
 
 # 类openai接口的建议提供者
 class OpenAIAdvisor(AdvisorInterface):
@@ -12,47 +26,50 @@ class OpenAIAdvisor(AdvisorInterface):
     temperature = ''
     endpoint = ''
     prompt = ''
+    max_tokens = 500
+    max_suggestions = 3
+    candidates = 3
 
-    def __init__(self, api_key, model, temperature, endpoint, prompt):
+    def __init__(self, api_key, model, temperature, endpoint, prompt, max_tokens=500, candidates=3,
+                 max_suggestions=3):
         self.api_key = api_key
         self.model = model
         self.temperature = float(temperature)  # 确保 temperature 为浮点数类型
         self.endpoint = endpoint
         self.prompt = prompt
+        self.max_tokens = int(max_tokens)
+        self.max_suggestions = int(max_suggestions)
+        # 多要几个候选，去重和排序后仍能留下足够的建议
+        self.candidates = max(int(candidates), self.max_suggestions)
         if not self.endpoint:
             self.endpoint = None
+        self._client = None
 
-    def get_text_suggestions(self, text) -> Optional[List[str]]:
-        """调用OpenAI API获取建议"""
-        try:
-            if not text.strip():
-                raise ValueError("输入文本不能为空")
+    def get_client(self):
+        """复用同一个客户端，保持HTTP连接"""
+        if self._client is None:
+            self._client = openai.OpenAI(api_key=self.api_key, base_url=self.endpoint)
+        return self._client
 
+    def complete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        """发送单条提示词，返回模型的原始回复"""
+        try:
             if not self.api_key:
                 raise ValueError("OpenAI API密钥未配置")
 
-            client = openai.OpenAI(api_key=self.api_key, base_url=self.endpoint)
-
-            prompt = self.prompt.replace("<text>", text)
-
-            response = client.chat.completions.create(
+            response = self.get_client().chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "你是一个专业的写作助手。"},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=self.temperature,
-                max_tokens=500
+                max_tokens=max_tokens or self.max_tokens
             )
 
-            content = response.choices[0].message.content
-            suggestions = [s.strip() for s in content.split("\n") if s.strip()]
-
-            if not suggestions:
-                raise ValueError("API返回了空建议")
-
+            content = response.choices[0].message.content or ""
             logging.debug(f"从OpenAI获取的原始响应: {content}")
-            return suggestions[:3]
+            return content
 
         except openai.AuthenticationError:
             error_msg = "OpenAI认证失败，请检查API密钥"
@@ -64,4 +81,37 @@ class OpenAIAdvisor(AdvisorInterface):
             raise ValueError(error_msg)
         except Exception as e:
             logging.error(f"OpenAI API调用失败: {str(e)}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def parse_suggestions(content: str) -> List[str]:
+        """把回复按行拆分为建议"""
+        return [s.strip() for s in content.split("\n") if s.strip()]
+
+    def build_prompt(self, text) -> str:
+        prompt = self.prompt
+        if COUNT_PLACEHOLDER in prompt:
+            prompt = prompt.replace(COUNT_PLACEHOLDER, str(self.candidates))
+        elif self.candidates > self.max_suggestions and not STATED_COUNT_PATTERN.search(prompt):
+            prompt += CANDIDATES_HINT.format(count=self.candidates)
+        return prompt.replace("<text>", text)
+
+    def finalize(self, text, lines: List[str]) -> List[str]:
+        """去重、过滤并排序候选"""
+        return rank_suggestions(text, lines, self.max_suggestions)
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        """调用OpenAI API获取建议"""
+        if not text.strip():
+            raise ValueError("输入文本不能为空")
+
+        lines = self.parse_suggestions(self.complete(self.build_prompt(text)))
+        suggestions = self.finalize(text, lines)
+
+        if not suggestions:
+            # 全部被过滤时退回原始结果，避免用户拿到空列表
+            suggestions = lines[:self.max_suggestions]
+        if not suggestions:
+            raise ValueError("API返回了空建议")
+
+        return suggestions
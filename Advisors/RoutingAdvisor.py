@@ -0,0 +1,130 @@
+import logging
+import re
+import threading
+import time
+from typing import Optional, List, Dict, Tuple
+
+from Advisors.AdvisorInterface import AdvisorInterface
+
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+CODE_PATTERN = re.compile(
+    r"```|</?[A-Za-z][\w-]*[^>]*>|[{};]\s*$|^\s*(def|class|function|import|return|var|let|const|#include)\b"
+    r"|=>|==|!=|\w+\([^)]*\)\s*[{:]",
+    re.MULTILINE
+)
+
+LATENCY_PROBE_EVERY = 10
+
+
+def analyze_text(text: str) -> dict:
+    """估算输入的token数、语言以及是否包含代码或标记"""
+    cjk = len(CJK_PATTERN.findall(text))
+    others = WORD_PATTERN.findall(CJK_PATTERN.sub(" ", text))
+    # 中日韩字符大约一字一个token，其余按词粗略估算
+    tokens = cjk + sum(max(len(w) // 4, 1) for w in others)
+    language = "zh" if cjk and cjk * 2 >= len(others) else "en"
+    return {
+        "tokens": tokens,
+        "language": language,
+        "code": bool(CODE_PATTERN.search(text)),
+    }
+
+
+class RouteStats:
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.ewma_latency = None
+
+    def record(self, latency: float, success: bool):
+        self.calls += 1
+        if success:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self.total_latency += latency
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = 0.8 * self.ewma_latency + 0.2 * latency
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "avg_ms": round(self.total_latency / self.calls * 1000) if self.calls else None,
+            "ewma_ms": round(self.ewma_latency * 1000) if self.ewma_latency is not None else None,
+        }
+
+
+class Route:
+    def __init__(self, name: str, advisor: AdvisorInterface, min_tokens=0, max_tokens=0, languages=None,
+                 code="any", max_latency_ms=0):
+        self.name = name
+        self.advisor = advisor
+        self.min_tokens = int(min_tokens)
+        self.max_tokens = int(max_tokens)
+        self.languages = [l.strip() for l in (languages or []) if l.strip()]
+        self.code = code
+        self.max_latency = float(max_latency_ms) / 1000
+        self.stats = RouteStats()
+        self.skipped = 0
+
+    def matches(self, features: dict) -> bool:
+        if features["tokens"] < self.min_tokens:
+            return False
+        if self.max_tokens and features["tokens"] > self.max_tokens:
+            return False
+        if self.languages and features["language"] not in self.languages:
+            return False
+        if self.code == "yes" and not features["code"]:
+            return False
+        if self.code == "no" and features["code"]:
+            return False
+        # 观测到的延迟过高时暂时跳过该路由
+        if self.max_latency and self.stats.ewma_latency is not None and self.stats.ewma_latency > self.max_latency:
+            self.skipped += 1
+            # 每跳过若干次放行一次，延迟恢复后才能重新被选中
+            return self.skipped % LATENCY_PROBE_EVERY == 0
+        return True
+
+
+# 按输入的长度、语言和内容类型在多个模型之间选择
+class RoutingAdvisor(AdvisorInterface):
+
+    def __init__(self, routes: List[Route], default: Route):
+        self.routes = routes
+        self.default = default
+        self._lock = threading.Lock()
+
+    def select_route(self, text: str) -> Tuple[Route, dict]:
+        features = analyze_text(text)
+        for route in self.routes:
+            if route.matches(features):
+                return route, features
+        return self.default, features
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        route, features = self.select_route(text)
+        start = time.perf_counter()
+        success = False
+        try:
+            suggestions = route.advisor.get_text_suggestions(text)
+            success = bool(suggestions)
+            return suggestions
+        finally:
+            latency = time.perf_counter() - start
+            with self._lock:
+                route.stats.record(latency, success)
+            logging.info(f"路由 {route.name}: tokens={features['tokens']} language={features['language']} "
+                         f"code={features['code']} 耗时 {latency * 1000:.0f}ms {'成功' if success else '失败'}")
+
+    def get_stats(self) -> Dict[str, dict]:
+        stats = {}
+        for route in self.routes + [self.default]:
+            stats[route.name] = dict(route.stats.to_dict(), **route.advisor.get_stats())
+        return {"routes": stats}
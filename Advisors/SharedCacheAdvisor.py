@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Optional, List
+
+from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.CachingAdvisor import cache_key
+from Advisors.SharedStores import SharedStore
+
+KEY_PREFIX = "text_enhancer"
+# 连续多次慢查询才视为存储故障，偶尔的网络抖动只算作未命中
+SLOW_LIMIT = 3
+
+
+def make_namespace(model: str, prompt: str) -> str:
+    """同一模型和提示词的结果才能互相复用"""
+    return hashlib.sha1(f"{model}\n{prompt}".encode("utf-8")).hexdigest()[:12]
+
+
+# 第二级缓存：本机未命中时查询团队共享的存储，写入在后台进行
+class SharedCacheAdvisor(AdvisorInterface):
+
+    def __init__(self, advisor: AdvisorInterface, store: SharedStore, readers: ThreadPoolExecutor,
+                 writers: ThreadPoolExecutor, namespace: str, timeout_ms=80, ttl_sec=30 * 24 * 3600, backoff_sec=30):
+        self.advisor = advisor
+        self.store = store
+        # 查询和写入分开排队，后台写入不会挤占查询
+        self.readers = readers
+        self.writers = writers
+        self.namespace = namespace
+        self.timeout = float(timeout_ms) / 1000
+        self.ttl = int(ttl_sec)
+        self.backoff = float(backoff_sec)
+        self._disabled_until = 0.0
+        self._slow = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.writes = 0
+
+    def make_key(self, text: str) -> str:
+        digest = hashlib.sha256(cache_key(text).encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{self.namespace}:{digest}"
+
+    def _lookup(self, key: str) -> Optional[List[str]]:
+        if time.monotonic() < self._disabled_until:
+            return None
+        try:
+            future = self.readers.submit(self._get, key)
+        except RuntimeError:
+            # 配置重新加载后旧线程池已关闭，正在处理的请求直接跳过共享缓存
+            return None
+        try:
+            # 最多等待timeout，随后直接请求API；只是排队久了不算存储故障
+            value = future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            self.timeouts += 1
+            return None
+        except Exception:
+            return None
+        if not value:
+            return None
+        try:
+            suggestions = json.loads(value)
+        except ValueError:
+            return None
+        return suggestions if isinstance(suggestions, list) and suggestions else None
+
+    def _get(self, key: str) -> Optional[str]:
+        """在线程池中执行，按存储本身的耗时判断是否故障"""
+        start = time.monotonic()
+        try:
+            value = self.store.get(key)
+        except Exception as e:
+            self._fail(f"查询共享缓存失败: {str(e)}")
+            raise
+        if time.monotonic() - start <= self.timeout:
+            self._slow = 0
+        else:
+            self._slow += 1
+            if self._slow >= SLOW_LIMIT:
+                self._slow = 0
+                self._fail(f"共享缓存连续{SLOW_LIMIT}次查询超时")
+        return value
+
+    def _fail(self, message: str):
+        self.errors += 1
+        self._disabled_until = time.monotonic() + self.backoff
+        logging.warning(f"{message}，{self.backoff:.0f}秒内跳过共享缓存")
+
+    def _write(self, key: str, suggestions: List[str]):
+        try:
+            self.store.set(key, json.dumps(suggestions, ensure_ascii=False), self.ttl)
+            self.writes += 1
+        except Exception as e:
+            self._fail(f"写入共享缓存失败: {str(e)}")
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        key = self.make_key(text)
+        suggestions = self._lookup(key)
+        if suggestions is not None:
+            self.hits += 1
+            return suggestions
+
+        self.misses += 1
+        suggestions = self.advisor.get_text_suggestions(text)
+        if suggestions and time.monotonic() >= self._disabled_until:
+            try:
+                self.writers.submit(self._write, key, suggestions)
+            except RuntimeError:
+                logging.debug("共享缓存线程池已关闭，跳过写入")
+        return suggestions
+
+    def get_stats(self) -> dict:
+        return dict(self.advisor.get_stats(), shared_hits=self.hits, shared_misses=self.misses,
+                    shared_errors=self.errors, shared_timeouts=self.timeouts, shared_writes=self.writes)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import abstractmethod, ABCMeta
+from typing import Optional, List
+from urllib.parse import urlparse, unquote
+
+
+# 团队共享缓存的键值存储
+class SharedStore(metaclass=ABCMeta):
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: int):
+        pass
+
+
+class _RedisConnection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile("rb")
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def command(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self.sock.sendall(b"".join(parts))
+        return self.read_reply()
+
+    def read_reply(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("共享缓存连接已断开")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise ValueError(f"共享缓存返回错误: {body.decode()}")
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.file.read(length + 2)
+            return data[:-2].decode("utf-8")
+        raise ValueError(f"无法解析的共享缓存响应: {line!r}")
+
+
+class RedisStore(SharedStore):
+    """兼容Redis协议的最小客户端，只用到GET/SET，无需额外依赖；并发请求各用一条连接"""
+
+    def __init__(self, url: str, timeout=1.0, max_idle=8):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self.max_idle = int(max_idle)
+        self._idle: List[_RedisConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> _RedisConnection:
+        connection = _RedisConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.command("AUTH", self.password)
+            if self.db:
+                connection.command("SELECT", str(self.db))
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _acquire(self) -> _RedisConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _release(self, connection: _RedisConnection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _call(self, *args):
+        connection = self._acquire()
+        try:
+            result = connection.command(*args)
+        except Exception:
+            # 出错的连接状态未知，直接丢弃
+            connection.close()
+            raise
+        self._release(connection)
+        return result
+
+    def get(self, key: str) -> Optional[str]:
+        return self._call("GET", key)
+
+    def set(self, key: str, value: str, ttl: int):
+        if ttl > 0:
+            self._call("SET", key, value, "EX", str(ttl))
+        else:
+            self._call("SET", key, value)
+
+
+class SQLiteStore(SharedStore):
+    """本地或网络盘上的SQLite文件，便于测试"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=1.0)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: int):
+        expires = time.time() + ttl if ttl > 0 else None
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)", (key, value, expires))
+
+
+class FileStore(SharedStore):
+    """每个键一个JSON文件，可放在共享目录中"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires") and entry["expires"] < time.time():
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: str, ttl: int):
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "expires": time.time() + ttl if ttl > 0 else None}, f, ensure_ascii=False)
+        os.replace(temp, path)
+
+
+def create_store(config, max_idle=8) -> Optional[SharedStore]:
+    backend = config.get("shared_cache", "backend", fallback="").strip().lower()
+    if not backend:
+        return None
+    if backend == "redis":
+        return RedisStore(config.get("shared_cache", "url", fallback="redis://127.0.0.1:6379/0"),
+                          timeout=config.getfloat("shared_cache", "connect_timeout_sec", fallback=1.0),
+                          max_idle=max_idle)
+    if backend == "sqlite":
+        return SQLiteStore(config.get("shared_cache", "path", fallback="shared_cache.db"))
+    if backend == "file":
+        return FileStore(config.get("shared_cache", "path", fallback="shared_cache"))
+    raise ValueError(f"不支持的共享缓存类型: {backend}")
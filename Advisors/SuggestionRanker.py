@@ -0,0 +1,92 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List
+
+# 编号后需紧跟空白，或是不接数字的“N、”“N)”，避免截掉“3.5亿”“2024: ...”这类正文
+LIST_MARKER_PATTERN = re.compile(
+    r"^\s*(?:[-*•·>]+\s+|\d{1,2}[.)）:：]\s+|\d{1,2}[、)）](?!\d)|[（(]\d{1,2}[)）]\s*"
+    r"|[一二三四五六七八九十]{1,3}[、．]|(?:选项|方案|option)\s*\d{1,2}\s*[:：.、)）]\s*)",
+    re.IGNORECASE
+)
+PREAMBLE_PATTERN = re.compile(
+    r"^(以下是|下面是|好的|当然|这里是|为您|\b(here (are|is)|sure|certainly|of course)\b)",
+    re.IGNORECASE
+)
+COLON_END_PATTERN = re.compile(r"[:：]$")
+EXPLANATION_PATTERN = re.compile(r"^(注意|注|说明|解释|备注|note)\s*[:：]", re.IGNORECASE)
+QUOTES = "\"'“”‘’「」『』"
+PUNCTUATION_PATTERN = re.compile(r"[\W_]+")
+
+DUPLICATE_THRESHOLD = 0.9
+ECHO_THRESHOLD = 0.95
+PREAMBLE_SIMILARITY = 0.3
+
+
+def clean_line(line: str) -> str:
+    """去掉编号、项目符号和包裹的引号"""
+    line = LIST_MARKER_PATTERN.sub("", line.strip(), count=1)
+    line = line.strip()
+    if len(line) >= 2 and line[0] in QUOTES and line[-1] in QUOTES:
+        line = line[1:-1].strip()
+    return line
+
+
+def comparable(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return PUNCTUATION_PATTERN.sub("", text)
+
+
+def similarity(a: str, b: str) -> float:
+    a, b = comparable(a), comparable(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def is_explanation(original: str, line: str) -> bool:
+    """模型附加的说明行；原文本身以同样的词开头时视为正常改写"""
+    match = EXPLANATION_PATTERN.match(line.strip())
+    return bool(match) and not original.strip().casefold().startswith(match.group(1).casefold())
+
+
+def is_preamble(original: str, line: str, index: int) -> bool:
+    """只有第一行、以冒号结尾或以客套话开头、且与原文无关时才视为开场白"""
+    line = line.strip()
+    if index != 0 or not (COLON_END_PATTERN.search(line) or PREAMBLE_PATTERN.match(line)):
+        return False
+    return similarity(line, original) < PREAMBLE_SIMILARITY
+
+
+def rank_suggestions(original: str, lines: List[str], limit=3) -> List[str]:
+    """清理模型返回的行：去掉说明、与原文相同及彼此近似的候选，再按质量排序"""
+    candidates = []
+    lines = [line for line in lines if line.strip()]
+    for index, line in enumerate(lines):
+        if is_preamble(original, line, index) or is_explanation(original, line):
+            continue
+        line = clean_line(line)
+        if not line:
+            continue
+        if similarity(line, original) >= ECHO_THRESHOLD:
+            continue
+        if any(similarity(line, kept) >= DUPLICATE_THRESHOLD for kept in candidates):
+            continue
+        candidates.append(line)
+
+    original_length = max(len(comparable(original)), 1)
+
+    def score(item):
+        index, line = item
+        ratio = len(comparable(line)) / original_length
+        # 保留模型自身的顺序，长度明显失衡或与原文过于接近的往后排
+        penalty = index * 0.1
+        if ratio < 0.3 or ratio > 3:
+            penalty += 1
+        penalty += max(similarity(line, original) - 0.8, 0) * 2
+        return penalty
+
+    ranked = [line for _, line in sorted(enumerate(candidates), key=score)]
+    return ranked[:limit]
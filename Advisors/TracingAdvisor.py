@@ -0,0 +1,25 @@
+import time
+from typing import Optional, List
+
+from Advisors.AdvisorInterface import AdvisorInterface
+
+
+# 把每次建议请求的耗时和结果写入会话记录
+class TracingAdvisor(AdvisorInterface):
+
+    def __init__(self, advisor: AdvisorInterface, recorder):
+        self.advisor = advisor
+        self.recorder = recorder
+
+    def get_text_suggestions(self, text) -> Optional[List[str]]:
+        start = time.perf_counter()
+        try:
+            suggestions = self.advisor.get_text_suggestions(text)
+        except Exception as e:
+            self.recorder.record_advise(text, time.perf_counter() - start, 0, error=type(e).__name__)
+            raise
+        self.recorder.record_advise(text, time.perf_counter() - start, len(suggestions or []))
+        return suggestions
+
+    def get_stats(self) -> dict:
+        return self.advisor.get_stats()
@@ -5,4 +5,5 @@ from PyQt5.QtCore import QObject, pyqtSignal
 class WorkerSignals(QObject):
     getting_suggestions = pyqtSignal(str)
     show_status = pyqtSignal(str, bool)  # 用于更新状态栏的信号，同时显示窗口
-    show_suggestions = pyqtSignal(list)  # 用于更新建议列表的信号
\ No newline at end of file
+    show_suggestions = pyqtSignal(list)  # 用于更新建议列表的信号
+    show_sections = pyqtSignal(list)  # 多风格时创建分组的信号，元素为(名称, 标题)
\ No newline at end of file
@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from PyQt5.QtCore import QObject, QMimeData, QByteArray, Qt, pyqtSignal
+from PyQt5.QtGui import QClipboard
+from PyQt5.QtWidgets import QApplication
+
+
+class ClipboardSnapshot:
+    """剪贴板全部格式的快照，数据保存在QByteArray中，不转换为Python字符串"""
+
+    def __init__(self, mime: QMimeData):
+        self.formats: List[Tuple[str, QByteArray]] = [(fmt, mime.data(fmt)) for fmt in mime.formats()] if mime else []
+
+    def is_empty(self) -> bool:
+        return not self.formats
+
+    def to_mime_data(self) -> QMimeData:
+        mime = QMimeData()
+        for fmt, data in self.formats:
+            mime.setData(fmt, data)
+        return mime
+
+
+# 获取选中文本：优先读取X11主选区，否则模拟复制，并在剪贴板确实被改动时完整恢复
+class ClipboardManager(QObject):
+    _invoke = pyqtSignal(object)
+
+    def __init__(self, copy_timeout_ms=500, settle_ms=30, use_selection=True):
+        super().__init__()
+        self.copy_timeout = float(copy_timeout_ms) / 1000
+        self.settle = float(settle_ms) / 1000
+        self.use_selection = use_selection
+        self.clipboard = QApplication.clipboard()
+        self._changes = 0
+        self._main_thread = threading.current_thread()
+        self.clipboard.dataChanged.connect(self._on_data_changed)
+        self._invoke.connect(self._run, Qt.BlockingQueuedConnection)
+
+    def _on_data_changed(self):
+        self._changes += 1
+
+    @staticmethod
+    def _run(call):
+        call()
+
+    def call_in_main_thread(self, fn):
+        """QClipboard只能在GUI线程使用，快捷键回调所在线程需要转发过去"""
+        if threading.current_thread() is self._main_thread:
+            return fn()
+        result = {}
+
+        def call():
+            try:
+                result["value"] = fn()
+            except Exception as e:
+                result["error"] = e
+
+        self._invoke.emit(call)
+        if "error" in result:
+            raise result["error"]
+        return result.get("value")
+
+    def read_selection(self) -> str:
+        if not self.use_selection or not self.clipboard.supportsSelection():
+            return ""
+        return self.clipboard.text(QClipboard.Selection)
+
+    def take_snapshot(self) -> ClipboardSnapshot:
+        return ClipboardSnapshot(self.clipboard.mimeData())
+
+    def restore(self, snapshot: ClipboardSnapshot):
+        if snapshot.is_empty():
+            self.clipboard.clear()
+        else:
+            self.clipboard.setMimeData(snapshot.to_mime_data())
+
+    def capture_selection(self, send_copy: Callable[[], None]) -> str:
+        """获取当前选中的文本，send_copy负责向前台程序发送复制快捷键"""
+        text = self.call_in_main_thread(self.read_selection)
+        if text and text.strip():
+            logging.debug("从主选区读取选中文本，跳过剪贴板")
+            return text
+
+        snapshot = self.call_in_main_thread(self.take_snapshot)
+        before = self._changes
+        send_copy()
+
+        # 等待剪贴板变化，而不是固定等待
+        deadline = time.perf_counter() + self.copy_timeout
+        while self._changes == before and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        if self._changes == before:
+            logging.debug("剪贴板未变化，视为未选中文本")
+            return ""
+
+        # 部分程序会先清空再写入，等变化停止后再读取
+        last = self._changes
+        time.sleep(self.settle)
+        while self._changes != last and time.perf_counter() < deadline:
+            last = self._changes
+            time.sleep(self.settle)
+
+        text = self.call_in_main_thread(self.clipboard.text)
+        self.call_in_main_thread(lambda: self.restore(snapshot))
+        logging.debug("剪贴板内容已恢复")
+        return text
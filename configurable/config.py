@@ -10,9 +10,100 @@ DEFAULT_CONFIG = {
         "api_provider": "openai",
         "window_width": "400",
         "window_height": "200",
-        "prompt": f"请为以下文本提供三种更优雅、专业的表达方式，保持原意但改进措辞。"
-                f"直接返回三个选项，每个选项占一行，不要编号或其他说明。\n\n"
+        "prompt": f"请为以下文本提供<count>种更优雅、专业的表达方式，保持原意但改进措辞。"
+                f"直接返回<count>个选项，每个选项占一行，不要编号或其他说明。\n\n"
                 f"文本:<text>",
+        "profiles": "",
+        "progressive": "false",
+        "batch_window_ms": "0",
+        "batch_max_size": "8",
+        "batch_max_chars": "80",
+        "first_paint_budget_ms": "50",
+        "cache_size": "256",
+        "candidates": "5",
+        "copy_timeout_ms": "500",
+        "use_primary_selection": "true",
+    },
+    "profile.formal": {
+        "title": "正式",
+        "prompt": f"请将以下文本改写为<count>种正式、专业的表达方式，保持原意。"
+                  f"直接返回<count>个选项，每个选项占一行，不要编号或其他说明。\n\n"
+                  f"文本:<text>",
+    },
+    "profile.concise": {
+        "title": "简洁",
+        "prompt": f"请将以下文本改写为<count>种更简洁的表达方式，去掉冗余但保留关键信息。"
+                  f"直接返回<count>个选项，每个选项占一行，不要编号或其他说明。\n\n"
+                  f"文本:<text>",
+    },
+    "profile.english": {
+        "title": "翻译为英文",
+        "prompt": f"请将以下文本翻译为<count>种地道的英文表达。"
+                  f"直接返回<count>个选项，每个选项占一行，不要编号或其他说明。\n\n"
+                  f"文本:<text>",
+    },
+    "draft": {
+        "model": "gpt-4o-mini",
+        "max_tokens": "200",
+    },
+    "monitor": {
+        "enabled": "true",
+        "interval_sec": "60",
+        "rss_growth_mb": "100",
+        "widget_limit": "500",
+        "thread_limit": "20",
+    },
+    "profiler": {
+        "interval_ms": "10",
+        "output_dir": "profiles",
+        "max_duration_sec": "600",
+    },
+    "prefilter": {
+        "enabled": "true",
+        "rules": "punctuation,number,url,path,single_word,code",
+    },
+    "engine": {
+        "enabled": "false",
+        "autostart": "true",
+        "socket": "",
+        "host": "127.0.0.1",
+        "port": "8765",
+        "timeout_sec": "60",
+        "control_timeout_sec": "1",
+        "max_concurrency": "8",
+        "batch_window_ms": "30",
+    },
+    "trace": {
+        "enabled": "false",
+        "file": "text_enhancer_trace.jsonl",
+        "redact": "true",
+    },
+    "shared_cache": {
+        "backend": "",
+        "url": "redis://127.0.0.1:6379/0",
+        "path": "shared_cache.db",
+        "timeout_ms": "80",
+        "ttl_sec": "2592000",
+        "backoff_sec": "30",
+        "connect_timeout_sec": "1",
+    },
+    "probe": {
+        "endpoints": "",
+        "models": "",
+        "auto_select": "false",
+        "selected_endpoint": "",
+        "interval_sec": "0",
+        "timeout_sec": "10",
+    },
+    "router": {
+        "routes": "",
+    },
+    "route.fast": {
+        "model": "gpt-4o-mini",
+        "max_input_tokens": "30",
+        "code": "no",
+        "max_tokens": "200",
+        "max_latency_ms": "3000",
     },
     "openai": {
         "api_key": "your-api-key-here",
@@ -28,6 +119,11 @@ DEFAULT_CONFIG = {
     }
 }
 
+def legacy_prompt(prompt: str) -> str:
+    """旧版默认提示词把数量写死为三个"""
+    return prompt.replace("<count>种", "三种").replace("<count>个选项", "三个选项")
+
+
 class ConfigManager:
     _instance = None
 
@@ -48,6 +144,7 @@ class ConfigManager:
                         self.config.write(f)
                 else:
                     self.config.read(CONFIG_FILE)
+                    self.migrate_prompts()
                     logging.info("配置文件加载成功")
                 self.initialized = True
             except Exception as e:
@@ -71,6 +168,33 @@ class ConfigManager:
         """获取配置值"""
         return self.config.getfloat(section, key, fallback=fallback)
 
+    def getint(self, section, key, fallback=None):
+        """获取配置值"""
+        return self.config.getint(section, key, fallback=fallback)
+
+    def getboolean(self, section, key, fallback=None):
+        """获取配置值"""
+        return self.config.getboolean(section, key, fallback=fallback)
+
+    def has_section(self, section):
+        return self.config.has_section(section)
+
+    def sections(self):
+        return self.config.sections()
+
+    def reload(self):
+        """重新读取配置文件"""
+        self.config.read(CONFIG_FILE)
+        self.migrate_prompts()
+
+    def migrate_prompts(self):
+        """未修改过的旧版默认提示词换成带<count>的新版，使候选数量设置生效；用户自定义的提示词保持不变"""
+        for section, values in DEFAULT_CONFIG.items():
+            prompt = values.get("prompt")
+            if prompt and "<count>" in prompt and self.config.get(section, "prompt", fallback=None) == legacy_prompt(prompt):
+                self.config.set(section, "prompt", prompt)
+                logging.info(f"已将 [{section}] 的默认提示词更新为新版")
+
     def save(self, config_file=CONFIG_FILE):
         try:
             with open(CONFIG_FILE, "w") as f:
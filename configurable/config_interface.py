@@ -1,8 +1,10 @@
+import json
 import logging
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTabWidget, QWidget, \
-    QMessageBox, QGridLayout, QTextEdit
+    QMessageBox, QGridLayout, QTextEdit, QComboBox, QCheckBox
 
 from configurable.config import get_config
+from endpoint_probe import EndpointProber
 
 class ConfigInterface(QDialog):
 
@@ -15,6 +17,17 @@ class ConfigInterface(QDialog):
         self.openai_api_key_input = None
         self.hotkey_input = None
         self.api_provider_combo = None
+        self.diagnostics_output = None
+        self.profiles_input = None
+        self.profile_combo = None
+        self.profile_prompt_input = None
+        self.profile_prompts = {}
+        self.probe_endpoints_input = None
+        self.probe_models_input = None
+        self.probe_interval_input = None
+        self.probe_auto_select_check = None
+        self.probe_output = None
+        self.prober = None
         self.main_app = main_app
         self.config = get_config()
 
@@ -35,6 +48,56 @@ class ConfigInterface(QDialog):
         default_config = self.config.get_default()
         self.prompt_input.setText(default_config["settings"]["prompt"])
 
+    def switch_profile(self, index):
+        """切换风格前先暂存正在编辑的提示词"""
+        previous = self.profile_combo.property("current_profile")
+        if previous:
+            self.profile_prompts[previous] = self.profile_prompt_input.toPlainText()
+        name = self.profile_combo.itemText(index)
+        self.profile_combo.setProperty("current_profile", name)
+        self.profile_prompt_input.setText(self.profile_prompts.get(name, ""))
+
+    def show_memory_sample(self):
+        if not self.main_app:
+            return
+        sample = self.main_app.memory_monitor.collect()
+        self.diagnostics_output.setPlainText("\n".join(f"{key}: {value}" for key, value in sample.items()))
+
+    def show_memory_snapshot(self):
+        if not self.main_app:
+            return
+        self.diagnostics_output.setPlainText(self.main_app.memory_monitor.snapshot())
+
+    def show_advisor_stats(self):
+        if not self.main_app:
+            return
+        stats = self.main_app.get_stats()
+        self.diagnostics_output.setPlainText(json.dumps(stats, ensure_ascii=False, indent=2))
+
+    def toggle_profiler(self):
+        if not self.main_app:
+            return
+        self.diagnostics_output.setPlainText(self.main_app.toggle_profiler())
+
+    def get_prober(self) -> EndpointProber:
+        if self.prober is None:
+            self.prober = self.main_app.endpoint_prober if self.main_app else EndpointProber(self.config)
+            self.prober.results_ready.connect(self.show_probe_results)
+        return self.prober
+
+    def start_probe(self):
+        """按当前输入的接入点和模型测速，结果在后台线程完成后显示；输入只在保存时写入配置"""
+        if self.get_prober().probe(self.probe_endpoints_input.text().strip(), self.probe_models_input.text().strip()):
+            self.probe_output.setPlainText("正在测速...")
+
+    def show_probe_results(self, results: list):
+        results = sorted(results, key=lambda r: (not r.healthy, r.total or 0))
+        lines = [result.describe() for result in results]
+        selected = self.config.get("probe", "selected_endpoint", fallback="")
+        if self.config.getboolean("probe", "auto_select", fallback=False) and selected:
+            lines.append(f"\n当前使用: {selected}")
+        self.probe_output.setPlainText("\n".join(lines))
+
     def init_ui(self):
         self.setWindowTitle('配置界面')
         self.setGeometry(200, 200, 600, 400)
@@ -113,10 +176,107 @@ class ConfigInterface(QDialog):
 
         prompt_tab.setLayout(prompt_layout)
 
+        # 提示词风格页面
+        profile_tab = QWidget()
+        profile_layout = QGridLayout()
+        label = QLabel("启用的风格:")
+        self.profiles_input = QLineEdit()
+        self.profiles_input.setPlaceholderText("以逗号分隔，例如 formal,concise,english；留空则只使用默认提示词")
+        self.profiles_input.setText(self.config.get("settings", "profiles", fallback=""))
+        profile_layout.addWidget(label, 0, 0)
+        profile_layout.addWidget(self.profiles_input, 0, 1)
+
+        label = QLabel("风格:")
+        self.profile_combo = QComboBox()
+        for section in self.config.sections():
+            if section.startswith("profile."):
+                name = section[len("profile."):]
+                self.profile_prompts[name] = self.config.get(section, "prompt", fallback="")
+                self.profile_combo.addItem(name)
+        profile_layout.addWidget(label, 1, 0)
+        profile_layout.addWidget(self.profile_combo, 1, 1)
+
+        label = QLabel("提示词:")
+        self.profile_prompt_input = QTextEdit()
+        profile_layout.addWidget(label, 2, 0)
+        profile_layout.addWidget(self.profile_prompt_input, 2, 1)
+
+        self.profile_combo.currentIndexChanged.connect(self.switch_profile)
+        if self.profile_combo.count():
+            self.switch_profile(0)
+
+        profile_tab.setLayout(profile_layout)
+
+        # 接入点测速页面
+        probe_tab = QWidget()
+        probe_layout = QGridLayout()
+        label = QLabel("备选接入点:")
+        self.probe_endpoints_input = QLineEdit()
+        self.probe_endpoints_input.setPlaceholderText("以逗号分隔的网关或镜像地址，API设置中的接入点总会参与测速")
+        self.probe_endpoints_input.setText(self.config.get("probe", "endpoints", fallback=""))
+        probe_layout.addWidget(label, 0, 0)
+        probe_layout.addWidget(self.probe_endpoints_input, 0, 1)
+
+        label = QLabel("额外模型:")
+        self.probe_models_input = QLineEdit()
+        self.probe_models_input.setPlaceholderText("以逗号分隔，已配置的模型总会参与测速")
+        self.probe_models_input.setText(self.config.get("probe", "models", fallback=""))
+        probe_layout.addWidget(label, 1, 0)
+        probe_layout.addWidget(self.probe_models_input, 1, 1)
+
+        label = QLabel("后台重测间隔(秒):")
+        self.probe_interval_input = QLineEdit()
+        self.probe_interval_input.setPlaceholderText("0表示不在后台重测")
+        self.probe_interval_input.setText(self.config.get("probe", "interval_sec", fallback="0"))
+        probe_layout.addWidget(label, 2, 0)
+        probe_layout.addWidget(self.probe_interval_input, 2, 1)
+
+        self.probe_auto_select_check = QCheckBox("自动使用最快的可用接入点")
+        self.probe_auto_select_check.setChecked(self.config.getboolean("probe", "auto_select", fallback=False))
+        probe_layout.addWidget(self.probe_auto_select_check, 3, 1)
+
+        probe_button = QPushButton("开始测速")
+        probe_button.clicked.connect(self.start_probe)
+        probe_layout.addWidget(probe_button, 3, 0)
+
+        self.probe_output = QTextEdit()
+        self.probe_output.setReadOnly(True)
+        probe_layout.addWidget(self.probe_output, 4, 0, 1, 2)
+
+        probe_tab.setLayout(probe_layout)
+
+        # 诊断页面
+        diagnostics_tab = QWidget()
+        diagnostics_layout = QGridLayout()
+        sample_button = QPushButton("内存采样")
+        sample_button.clicked.connect(self.show_memory_sample)
+        diagnostics_layout.addWidget(sample_button, 0, 0)
+
+        snapshot_button = QPushButton("内存快照对比")
+        snapshot_button.clicked.connect(self.show_memory_snapshot)
+        diagnostics_layout.addWidget(snapshot_button, 0, 1)
+
+        stats_button = QPushButton("请求统计")
+        stats_button.clicked.connect(self.show_advisor_stats)
+        diagnostics_layout.addWidget(stats_button, 0, 2)
+
+        profiler_button = QPushButton("开始/停止性能采样")
+        profiler_button.clicked.connect(self.toggle_profiler)
+        diagnostics_layout.addWidget(profiler_button, 0, 3)
+
+        self.diagnostics_output = QTextEdit()
+        self.diagnostics_output.setReadOnly(True)
+        diagnostics_layout.addWidget(self.diagnostics_output, 1, 0, 1, 4)
+
+        diagnostics_tab.setLayout(diagnostics_layout)
+
         # 添加标签页
         tab_widget.addTab(hotkey_tab, "快捷键")
         tab_widget.addTab(api_tab, "OPenAI API设置")
         tab_widget.addTab(prompt_tab, "提示词")
+        tab_widget.addTab(profile_tab, "风格")
+        tab_widget.addTab(probe_tab, "测速")
+        tab_widget.addTab(diagnostics_tab, "诊断")
 
         main_layout.addWidget(tab_widget)
 
@@ -142,6 +302,18 @@ class ConfigInterface(QDialog):
 
             self.config.set("settings", "prompt", self.prompt_input.toPlainText())
 
+            self.config.set("settings", "profiles", self.profiles_input.text().strip())
+            current = self.profile_combo.property("current_profile")
+            if current:
+                self.profile_prompts[current] = self.profile_prompt_input.toPlainText()
+            for name, prompt in self.profile_prompts.items():
+                self.config.set(f"profile.{name}", "prompt", prompt)
+
+            self.config.set("probe", "endpoints", self.probe_endpoints_input.text().strip())
+            self.config.set("probe", "models", self.probe_models_input.text().strip())
+            self.config.set("probe", "interval_sec", str(float(self.probe_interval_input.text().strip() or 0)))
+            self.config.set("probe", "auto_select", str(self.probe_auto_select_check.isChecked()).lower())
+
             self.config.save()
 
             QMessageBox.information(self, "成功", "设置已保存")
@@ -149,6 +321,8 @@ class ConfigInterface(QDialog):
 
             if self.main_app:
                 self.main_app.register_hotkey()
+                self.main_app.reload_advisor()
+                self.main_app.start_endpoint_prober()
         except Exception as e:
             logging.error(f"保存设置时出错: {str(e)}")
             QMessageBox.critical(self, "错误", f"保存设置失败: {str(e)}")
\ No newline at end of file
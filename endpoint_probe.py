@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import openai
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from Advisors.AdvisorFactory import DRAFT_SECTION, PROBE_SECTION, ROUTE_SECTION_PREFIX, get_endpoints
+
+PROBE_PROMPT = "请只回复OK"
+PROBE_MAX_TOKENS = 5
+
+
+class ProbeResult:
+    def __init__(self, endpoint: str, model: str, first_token: Optional[float] = None,
+                 total: Optional[float] = None, error: Optional[str] = None):
+        self.endpoint = endpoint
+        self.model = model
+        self.first_token = first_token
+        self.total = total
+        self.error = error
+
+    @property
+    def healthy(self) -> bool:
+        return self.error is None
+
+    def describe(self) -> str:
+        endpoint = self.endpoint or "(默认)"
+        if not self.healthy:
+            return f"✗ {endpoint} | {self.model} | {self.error}"
+        return f"✓ {endpoint} | {self.model} | 首字 {self.first_token * 1000:.0f}ms | 总计 {self.total * 1000:.0f}ms"
+
+
+def get_probe_models(config, extra: Optional[str] = None) -> List[str]:
+    """参与测速的模型：主模型、草稿模型、已启用路由的模型以及probe中额外列出（或extra临时指定）的模型"""
+    models = [config.get("openai", "model", fallback="")]
+    if config.getboolean("settings", "progressive", fallback=False):
+        models.append(config.get(DRAFT_SECTION, "model", fallback=""))
+    for name in config.get("router", "routes", fallback="").split(","):
+        if name.strip():
+            models.append(config.get(ROUTE_SECTION_PREFIX + name.strip(), "model", fallback=""))
+    if extra is None:
+        extra = config.get(PROBE_SECTION, "models", fallback="")
+    models += extra.split(",")
+
+    unique = []
+    for model in models:
+        if model.strip() and model.strip() not in unique:
+            unique.append(model.strip())
+    return unique
+
+
+def probe_endpoint(api_key: str, endpoint: str, model: str, timeout=10.0) -> ProbeResult:
+    """用极短的提示词流式请求一次，记录首个token和完整响应的耗时"""
+    try:
+        client = openai.OpenAI(api_key=api_key, base_url=endpoint or None, timeout=timeout, max_retries=0)
+        start = time.perf_counter()
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": PROBE_PROMPT}],
+            temperature=0,
+            max_tokens=PROBE_MAX_TOKENS,
+            stream=True,
+        )
+        first_token = None
+        for chunk in stream:
+            if first_token is None and chunk.choices and chunk.choices[0].delta.content:
+                first_token = time.perf_counter() - start
+        total = time.perf_counter() - start
+        return ProbeResult(endpoint, model, first_token if first_token is not None else total, total)
+    except Exception as e:
+        logging.debug(f"测速失败 {endpoint} {model}: {str(e)}")
+        return ProbeResult(endpoint, model, error=str(e) or type(e).__name__)
+
+
+def select_fastest(results: List[ProbeResult], model: str) -> Optional[ProbeResult]:
+    """在主模型可用的接入点中选出总耗时最短的"""
+    healthy = [r for r in results if r.healthy and r.model == model]
+    return min(healthy, key=lambda r: r.total, default=None)
+
+
+# 在后台线程中测速，可按间隔定期重测，结果通过信号交给GUI线程
+class EndpointProber(QObject):
+    results_ready = pyqtSignal(list)
+
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.results: List[ProbeResult] = []
+        self.probed_at = None
+        self._running = False
+        self._lock = threading.Lock()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.probe)
+
+    def get_targets(self, endpoints: Optional[str] = None, models: Optional[str] = None) -> List[Tuple[str, str]]:
+        return [(endpoint, model) for endpoint in get_endpoints(self.config, endpoints)
+                for model in get_probe_models(self.config, models)]
+
+    def probe(self, endpoints: Optional[str] = None, models: Optional[str] = None) -> bool:
+        """开始一轮测速，endpoints和models为逗号分隔的额外项，未指定时使用配置；上一轮未结束时返回False"""
+        targets = self.get_targets(endpoints, models)
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+        threading.Thread(target=self._run, args=(targets,), name="endpoint-probe", daemon=True).start()
+        return True
+
+    def _run(self, targets: List[Tuple[str, str]]):
+        try:
+            api_key = self.config.get("openai", "api_key", fallback="")
+            timeout = self.config.getfloat(PROBE_SECTION, "timeout_sec", fallback=10)
+            with ThreadPoolExecutor(max_workers=min(len(targets), 8) or 1) as executor:
+                results = list(executor.map(lambda t: probe_endpoint(api_key, t[0], t[1], timeout), targets))
+            self.results = results
+            self.probed_at = time.time()
+            for result in results:
+                logging.info(f"接入点测速: {result.describe()}")
+            self.results_ready.emit(results)
+        finally:
+            with self._lock:
+                self._running = False
+
+    def start(self, interval_sec=0):
+        """interval_sec大于0时定期重测"""
+        self.timer.stop()
+        if interval_sec > 0:
+            self.timer.setInterval(max(int(float(interval_sec) * 1000), 60 * 1000))
+            self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
@@ -0,0 +1,121 @@
+"""建议引擎客户端
+
+用法:
+    python -m engine.client "需要润色的文本"
+    echo "需要润色的文本" | python -m engine.client
+    python -m engine.client --stats
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from engine.protocol import HAS_UNIX_SOCKET, get_address, encode, decode
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class EngineClient:
+
+    def __init__(self, address, timeout=60.0, control_timeout=1.0):
+        self.address = address
+        self.timeout = timeout
+        # ping、统计等控制请求可能在GUI线程上调用，引擎卡住时不能长时间阻塞
+        self.control_timeout = control_timeout
+        self._ids = itertools.count(1)
+
+    def request(self, method: str, timeout=None, **params) -> dict:
+        family = socket.AF_UNIX if HAS_UNIX_SOCKET else socket.AF_INET
+        with socket.socket(family, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout or self.timeout)
+            s.connect(self.address)
+            s.sendall(encode(dict(params, method=method, id=next(self._ids))))
+            with s.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            raise ConnectionError("引擎连接已断开")
+        response = decode(line)
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "引擎返回了错误"))
+        return response
+
+    def ping(self) -> bool:
+        try:
+            self.request("ping", timeout=self.control_timeout)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def get_text_suggestions(self, text, profile=None, draft=False):
+        return self.request("suggest", text=text, profile=profile, draft=draft)["suggestions"]
+
+    def get_stats(self) -> dict:
+        return self.request("stats", timeout=self.control_timeout)["stats"]
+
+    def reload(self):
+        self.request("reload", timeout=self.control_timeout)
+
+
+def start_engine(client: EngineClient, wait=5.0) -> bool:
+    """在后台启动引擎进程，并等待其可用"""
+    if client.ping():
+        return True
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    # 保持当前工作目录，使引擎读取同一份配置文件
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get("PYTHONPATH")])))
+    subprocess.Popen([sys.executable, "-m", "engine.server"], env=env,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+    logging.info("已在后台启动建议引擎")
+
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if client.ping():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def create_client(config) -> EngineClient:
+    return EngineClient(get_address(config), timeout=config.getfloat("engine", "timeout_sec", fallback=60),
+                        control_timeout=config.getfloat("engine", "control_timeout_sec", fallback=1))
+
+
+def main():
+    from configurable.config import get_config
+
+    parser = argparse.ArgumentParser(description="通过常驻引擎获取文本建议")
+    parser.add_argument("text", nargs="?", help="待处理文本，省略时从标准输入读取")
+    parser.add_argument("--profile", help="使用指定的提示词风格")
+    parser.add_argument("--draft", action="store_true", help="使用草稿模型")
+    parser.add_argument("--stats", action="store_true", help="查看引擎统计")
+    parser.add_argument("--reload", action="store_true", help="让引擎重新加载配置")
+    parser.add_argument("--no-start", action="store_true", help="引擎未运行时不自动启动")
+    args = parser.parse_args()
+
+    config = get_config()
+    client = create_client(config)
+    if not (client.ping() or (not args.no_start and start_engine(client))):
+        print("无法连接建议引擎", file=sys.stderr)
+        sys.exit(1)
+
+    if args.stats:
+        print(json.dumps(client.get_stats(), ensure_ascii=False, indent=2))
+    elif args.reload:
+        client.reload()
+    else:
+        text = args.text if args.text is not None else sys.stdin.read()
+        for suggestion in client.get_text_suggestions(text.strip(), args.profile, args.draft):
+            print(suggestion)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import json
+import os
+import socket
+import tempfile
+
+# 每条消息为一行JSON，以换行结尾
+ENCODING = "utf-8"
+HAS_UNIX_SOCKET = hasattr(socket, "AF_UNIX")
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "text_enhancer_engine.sock")
+
+
+def get_address(config):
+    """返回引擎的监听地址：支持Unix域套接字时为路径，否则为(host, port)"""
+    if HAS_UNIX_SOCKET:
+        return config.get("engine", "socket", fallback="") or DEFAULT_SOCKET
+    return (config.get("engine", "host", fallback="127.0.0.1"),
+            config.getint("engine", "port", fallback=8765))
+
+
+def encode(message: dict) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode(ENCODING)
+
+
+def decode(line: bytes) -> dict:
+    return json.loads(line.decode(ENCODING))
@@ -0,0 +1,139 @@
+"""建议引擎守护进程
+
+常驻后台，持有建议提供者（HTTP连接、批量队列等），通过本地套接字为弹窗、命令行和编辑器插件提供服务。
+
+用法:
+    python -m engine.server
+"""
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from Advisors.AdvisorFactory import create_advisor, create_draft_advisor, get_profile_names
+from configurable.config import get_config
+from engine.protocol import HAS_UNIX_SOCKET, get_address, encode, decode
+from logger import setup_logging
+
+ENGINE_LOG_FILE = "text_enhancer_engine.log"
+
+
+class EngineRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        # 同一连接上可以连续发送多条请求
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = decode(line)
+            except ValueError:
+                self.wfile.write(encode({"ok": False, "error": "请求格式不正确"}))
+                continue
+            response = self.server.engine.handle(request)
+            response["id"] = request.get("id")
+            self.wfile.write(encode(response))
+            self.wfile.flush()
+
+
+if HAS_UNIX_SOCKET:
+    class EngineSocketServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    class EngineSocketServer(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+
+class Engine:
+
+    def __init__(self, config):
+        self.config = config
+        self.load_advisors()
+        self.slots = threading.BoundedSemaphore(config.getint("engine", "max_concurrency", fallback=8))
+        self.requests = 0
+        self.failures = 0
+
+    def load_advisors(self):
+        # 引擎同时服务多个客户端，只有这里才值得为合并请求等待
+        window = self.config.getfloat("engine", "batch_window_ms", fallback=30)
+        self.advisor = create_advisor(self.config, batch_window_ms=window)
+        self.profile_advisors = {name: create_advisor(self.config, profile=name, batch_window_ms=window)
+                                 for name in get_profile_names(self.config)}
+        self.draft_advisor = create_draft_advisor(self.config, batch_window_ms=window)
+        self.profile_draft_advisors = {name: create_draft_advisor(self.config, profile=name, batch_window_ms=window)
+                                       for name in self.profile_advisors}
+
+    def handle(self, request: dict) -> dict:
+        method = request.get("method")
+        try:
+            if method == "suggest":
+                self.requests += 1
+                if request.get("draft"):
+                    advisor = self.profile_draft_advisors.get(request.get("profile"), self.draft_advisor)
+                else:
+                    advisor = self.profile_advisors.get(request.get("profile"), self.advisor)
+                with self.slots:
+                    suggestions = advisor.get_text_suggestions(request.get("text", ""))
+                return {"ok": True, "suggestions": suggestions}
+            if method == "ping":
+                return {"ok": True, "pid": os.getpid()}
+            if method == "stats":
+                stats = dict(self.advisor.get_stats(), requests=self.requests, failures=self.failures)
+                for name, advisor in self.profile_advisors.items():
+                    stats[f"profile.{name}"] = advisor.get_stats()
+                return {"ok": True, "stats": stats}
+            if method == "reload":
+                self.config.reload()
+                self.load_advisors()
+                logging.info("引擎已重新加载配置")
+                return {"ok": True}
+            return {"ok": False, "error": f"未知方法: {method}"}
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"引擎处理请求失败: {str(e)}")
+            return {"ok": False, "error": str(e)}
+
+
+def is_running(address) -> bool:
+    family = socket.AF_UNIX if HAS_UNIX_SOCKET else socket.AF_INET
+    try:
+        with socket.socket(family, socket.SOCK_STREAM) as s:
+            s.settimeout(0.5)
+            s.connect(address)
+        return True
+    except OSError:
+        return False
+
+
+def serve(config=None):
+    config = config or get_config()
+    address = get_address(config)
+
+    if is_running(address):
+        logging.warning(f"引擎已经在运行: {address}")
+        return
+    if HAS_UNIX_SOCKET and os.path.exists(address):
+        # 上次异常退出遗留的套接字文件
+        os.unlink(address)
+
+    server = EngineSocketServer(address, EngineRequestHandler)
+    server.engine = Engine(config)
+    if HAS_UNIX_SOCKET:
+        os.chmod(address, 0o600)
+    logging.info(f"建议引擎已启动: {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if HAS_UNIX_SOCKET and os.path.exists(address):
+            os.unlink(address)
+        logging.info("建议引擎已退出")
+
+
+if __name__ == "__main__":
+    setup_logging(ENGINE_LOG_FILE)
+    serve()
@@ -4,12 +4,12 @@ from logging.handlers import RotatingFileHandler
 LOG_FILE = "text_enhancer.log"
 
 # 设置日志
-def setup_logging():
+def setup_logging(log_file=LOG_FILE):
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
         handlers=[
-            RotatingFileHandler(LOG_FILE, maxBytes=1024 * 1024, backupCount=5, encoding='utf-8'),
+            RotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=5, encoding='utf-8'),
             logging.StreamHandler()
         ]
     )
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+import signal
 import sys
 import threading
 import time
@@ -6,15 +7,25 @@ import typing
 from typing import List, Optional
 
 import keyboard
-import pyperclip
-from PyQt5.QtCore import QSharedMemory, QThread, pyqtSignal
+from PyQt5.QtCore import QSharedMemory, QThread, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox, QApplication
 
-from Advisors.OpenAIAdvisor import OpenAIAdvisor
+from Advisors.AdvisorFactory import create_advisor, create_cache, create_draft_advisor, get_profile_names, \
+    get_profile_title, get_endpoints
+from Advisors.EngineAdvisor import EngineAdvisor
+from Advisors.TracingAdvisor import TracingAdvisor
 from WorkerSignals import WorkerSignals
+from clipboard_snapshot import ClipboardManager
 from configurable.config import get_config
 from configurable.config_interface import ConfigInterface
+from endpoint_probe import EndpointProber, select_fastest
+from engine.client import create_client, start_engine
 from logger import setup_logging
+from memory_monitor import MemoryMonitor
+from prefilter import PreFilter, SKIP, LOCAL
+from refinement import RefinementTracker
+from sampling_profiler import SamplingProfiler
+from session_trace import TraceRecorder
 from src.main_interface import MainInterface
 
 setup_logging()
@@ -31,6 +42,30 @@ class TextEnhancerApp(QApplication):
         self.main_window = MainInterface(main_app=self)
         self.config_window = ConfigInterface(main_app=self)
         self.config = get_config()
+        self.trace_recorder = self.create_trace_recorder()
+        self.cache = None
+        self.build_advisors()
+        self.prefilter = self.create_prefilter()
+        self.workers = []
+        self.worker = None
+        self.draft_worker = None
+        self.profile_workers = []
+        self.profile_draft_workers = []
+        self.refinement = RefinementTracker()
+        self.clipboard_manager = ClipboardManager(
+            copy_timeout_ms=self.config.getfloat("settings", "copy_timeout_ms", fallback=500),
+            use_selection=self.config.getboolean("settings", "use_primary_selection", fallback=True),
+        )
+        self.memory_monitor = self.create_memory_monitor()
+        self.profiler = SamplingProfiler(
+            interval_ms=self.config.getfloat("profiler", "interval_ms", fallback=10),
+            output_dir=self.config.get("profiler", "output_dir", fallback="profiles"),
+            max_duration_sec=self.config.getfloat("profiler", "max_duration_sec", fallback=600),
+        )
+        self.install_profiler_signal()
+        self.endpoint_prober = EndpointProber(self.config)
+        self.endpoint_prober.results_ready.connect(self.on_probe_results)
+        self.start_endpoint_prober()
 
         # 禁用“最后一个窗口关闭时退出”的行为
         self.setQuitOnLastWindowClosed(False)
@@ -45,6 +80,7 @@ class TextEnhancerApp(QApplication):
         else:
             self.register_hotkey()
         self.selected_text = ""
+        self.hotkey_pressed_at = None
         logging.info("应用程序初始化完成")
 
     # 检查api是否满足运行要求，否则显示配置窗口
@@ -60,6 +96,134 @@ class TextEnhancerApp(QApplication):
                 return False
         return True
 
+    def create_trace_recorder(self) -> Optional[TraceRecorder]:
+        if not self.config.getboolean("trace", "enabled", fallback=False):
+            return None
+        try:
+            return TraceRecorder(
+                self.config.get("trace", "file", fallback="text_enhancer_trace.jsonl"),
+                redact=self.config.getboolean("trace", "redact", fallback=True),
+            )
+        except Exception as e:
+            logging.error(f"开启会话记录失败: {str(e)}")
+            return None
+
+    def build_advisors(self):
+        """创建默认及各提示词风格的建议提供者"""
+        self.engine_client = None
+        if self.config.getboolean("engine", "enabled", fallback=False):
+            # 由常驻引擎持有连接和缓存，本地建议提供者仅作为后备
+            self.engine_client = create_client(self.config)
+            if self.config.getboolean("engine", "autostart", fallback=True) and not start_engine(self.engine_client):
+                logging.warning("建议引擎启动失败，将直接调用API")
+
+        self.advisor = self.build_advisor()
+        self.profile_advisors = {name: self.build_advisor(name) for name in get_profile_names(self.config)}
+
+        # 渐进模式：快速模型先给出草稿，完整结果到达后替换
+        self.draft_advisor = None
+        self.profile_draft_advisors = {}
+        if self.config.getboolean("settings", "progressive", fallback=False):
+            self.draft_advisor = self.build_advisor(draft=True)
+            self.profile_draft_advisors = {name: self.build_advisor(name, draft=True) for name in self.profile_advisors}
+
+    def build_advisor(self, profile=None, draft=False):
+        if draft:
+            advisor = create_draft_advisor(self.config, cache=False, profile=profile)
+        else:
+            advisor = create_advisor(self.config, cache=False, profile=profile)
+        if self.engine_client:
+            advisor = EngineAdvisor(self.engine_client, advisor, profile=profile, draft=draft)
+        advisor = create_cache(self.config, advisor)
+        if draft:
+            return advisor
+        if profile is None:
+            self.cache = advisor
+        if self.trace_recorder:
+            advisor = TracingAdvisor(advisor, self.trace_recorder)
+        return advisor
+
+    def create_prefilter(self) -> Optional[PreFilter]:
+        if not self.config.getboolean("prefilter", "enabled", fallback=True):
+            return None
+        rules = self.config.get("prefilter", "rules", fallback=None)
+        return PreFilter(
+            [r.strip() for r in rules.split(",") if r.strip()] if rules is not None else None,
+            # 通过属性访问，重新加载后使用新的缓存；启用风格时各风格的结果不同，不查默认缓存
+            lookup=lambda text: None if self.profile_advisors else self.cache.peek(text),
+        )
+
+    def get_stats(self) -> dict:
+        stats = {"advisor": self.advisor.get_stats()}
+        for name, advisor in self.profile_advisors.items():
+            stats[f"profile.{name}"] = advisor.get_stats()
+        if self.draft_advisor:
+            stats["draft"] = self.draft_advisor.get_stats()
+            stats["refinement"] = self.refinement.get_stats()
+        if self.prefilter:
+            stats["prefilter"] = self.prefilter.get_stats()
+        if self.endpoint_prober.results:
+            stats["probe"] = [result.describe() for result in self.endpoint_prober.results]
+        return stats
+
+    def create_memory_monitor(self) -> MemoryMonitor:
+        monitor = MemoryMonitor(
+            interval_sec=self.config.getfloat("monitor", "interval_sec", fallback=60),
+            rss_growth_mb=self.config.getint("monitor", "rss_growth_mb", fallback=100),
+            widget_limit=self.config.getint("monitor", "widget_limit", fallback=500),
+            thread_limit=self.config.getint("monitor", "thread_limit", fallback=20),
+        )
+        monitor.register_counter("workers", lambda: len(self.workers))
+        monitor.register_counter("suggestion_buttons", lambda: len(self.main_window.suggestion_buttons))
+        monitor.register_counter("advisor", lambda: self.advisor.get_stats())
+        monitor.register_counter("prefilter", lambda: self.prefilter.get_stats() if self.prefilter else {})
+        if self.config.getboolean("monitor", "enabled", fallback=True):
+            monitor.start()
+        return monitor
+
+    def install_profiler_signal(self):
+        """POSIX下可通过 kill -USR2 <pid> 开关性能采样"""
+        if not hasattr(signal, "SIGUSR2"):
+            return
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self.toggle_profiler())
+        # Qt事件循环期间Python无法处理信号，定时让出控制权
+        self._signal_timer = QTimer()
+        self._signal_timer.timeout.connect(lambda: None)
+        self._signal_timer.start(500)
+
+    def toggle_profiler(self) -> str:
+        paths = self.profiler.toggle()
+        if self.profiler.running:
+            message = "性能采样已开始"
+        else:
+            message = f"性能采样已保存: {', '.join(paths)}" if paths else "性能采样未生成结果"
+        logging.info(message)
+        return message
+
+    def start_endpoint_prober(self):
+        """开启自动选择时启动即测速一次，配置了间隔时在后台定期重测"""
+        interval_sec = self.config.getfloat("probe", "interval_sec", fallback=0)
+        self.endpoint_prober.start(interval_sec)
+        if self.config.getboolean("probe", "auto_select", fallback=False) and self.check_config():
+            self.endpoint_prober.probe()
+
+    def on_probe_results(self, results: list):
+        if not self.config.getboolean("probe", "auto_select", fallback=False):
+            return
+        # 测速时可能临时加入了尚未保存的接入点，只在已保存的接入点中选择
+        endpoints = get_endpoints(self.config)
+        best = select_fastest([r for r in results if r.endpoint in endpoints],
+                              self.config.get("openai", "model", fallback=""))
+        if best is None:
+            logging.warning("测速未找到可用的接入点，保持当前设置")
+            return
+        if best.endpoint == self.config.get("probe", "selected_endpoint", fallback=""):
+            return
+        logging.info(f"自动切换到最快的接入点: {best.describe()}")
+        self.config.set("probe", "selected_endpoint", best.endpoint)
+        self.config.save()
+        self.reload_advisor()
+
     def show_config_window(self):
         self.config_window.show()
 
@@ -93,15 +257,12 @@ class TextEnhancerApp(QApplication):
         """快捷键回调函数"""
         try:
             logging.info("快捷键触发")
-            # 保存当前剪贴板内容
-            original_clipboard = pyperclip.paste()
-            logging.debug("剪贴板内容已保存")
+            self.hotkey_pressed_at = time.perf_counter()
 
             try:
-                # 模拟Ctrl+C复制选中的文本
-                keyboard.send("ctrl+c")
-                time.sleep(0.1)  # 等待剪贴板更新
-                self.selected_text = pyperclip.paste().strip()
+                # 模拟Ctrl+C复制选中的文本，剪贴板在读取后完整恢复
+                self.selected_text = self.clipboard_manager.capture_selection(
+                    lambda: keyboard.send("ctrl+c")).strip()
                 logging.debug(f"获取到选中文本: {self.selected_text}")
 
                 if not self.selected_text:
@@ -109,34 +270,144 @@ class TextEnhancerApp(QApplication):
                     logging.warning("未检测到选中文本")
                     return
 
+                decision = None
+                if self.prefilter:
+                    self.selected_text, decision = self.prefilter.check(self.selected_text)
+                    if decision.action == SKIP:
+                        self.signals.show_status.emit(f"无需增强（{decision.reason}）", False)
+                        return
+
+                if self.trace_recorder:
+                    self.trace_recorder.record_press(self.selected_text)
+
                 # 显示窗口并获取建议
                 self.signals.getting_suggestions.emit(self.selected_text)
+
+                if self.profile_advisors:
+                    self.start_profile_workers(self.selected_text)
+                    return
+
+                if decision and decision.action == LOCAL:
+                    # 本地已有结果，丢弃仍在进行中的请求
+                    self.worker = None
+                    self.draft_worker = None
+                    self.signals.show_suggestions.emit(decision.suggestions)
+                    self.prefilter.record_local()
+                    return
                 # threading.Thread(target=self.get_suggestions, daemon=True).start()
 
-                # 使用QThread代替普通线程
-                self.worker = SuggestionWorker(self.selected_text, self.config)
+                # 使用QThread代替普通线程，保留运行中线程的引用以免被回收
+                self.profile_workers = []
+                self.profile_draft_workers = []
+                self.refinement.start()
+                self.worker = self.start_worker(self.selected_text, self.advisor)
                 self.worker.finished.connect(self.on_suggestions_ready)
                 self.worker.error.connect(self.on_suggestion_error)
+                # 按创建顺序启动，上一次按键的线程仍由self.workers持有直到结束
                 self.worker.start()
 
+                self.draft_worker = None
+                if self.draft_advisor:
+                    self.draft_worker = self.start_worker(self.selected_text, self.draft_advisor)
+                    self.draft_worker.finished.connect(self.on_draft_ready)
+                    self.draft_worker.start()
+
             except Exception as e:
-                self.main_window.show_status(f"错误: {str(e)}", error=True)
+                self.signals.show_status.emit(f"错误: {str(e)}", True)
                 logging.error(f"处理选中文本时出错: {str(e)}")
-            finally:
-                # 恢复剪贴板内容
-                pyperclip.copy(original_clipboard)
-                logging.debug("剪贴板内容已恢复")
 
         except Exception as e:
             logging.error(f"快捷键回调出错: {str(e)}")
-            self.main_window.show_status(f"系统错误: {str(e)}", error=True)
+            self.signals.show_status.emit(f"系统错误: {str(e)}", True)
+
+    def start_worker(self, text: str, advisor, profile=None) -> "SuggestionWorker":
+        # 只清理已结束的线程；刚创建尚未启动的isRunning()也为False，不能丢掉引用
+        self.workers = [w for w in self.workers if not w.isFinished()]
+        worker = SuggestionWorker(text, advisor, profile)
+        self.workers.append(worker)
+        return worker
+
+    def start_profile_workers(self, text: str):
+        """所有风格同时请求，总等待时间取决于最慢的一个"""
+        self.worker = None
+        self.draft_worker = None
+        self.signals.show_sections.emit([(name, get_profile_title(self.config, name))
+                                         for name in self.profile_advisors])
+        self.refinement.start(self.profile_advisors)
+        self.profile_workers = []
+        for name, advisor in self.profile_advisors.items():
+            worker = self.start_worker(text, advisor, name)
+            worker.finished.connect(self.on_profile_suggestions_ready)
+            worker.error.connect(self.on_profile_suggestion_error)
+            self.profile_workers.append(worker)
+
+        self.profile_draft_workers = []
+        for name, advisor in self.profile_draft_advisors.items():
+            worker = self.start_worker(text, advisor, name)
+            worker.finished.connect(self.on_profile_draft_ready)
+            self.profile_draft_workers.append(worker)
+
+        for worker in self.profile_draft_workers + self.profile_workers:
+            worker.start()
+
+    def on_profile_draft_ready(self, suggestions: list):
+        worker = self.sender()
+        if worker not in self.profile_draft_workers or self.refinement.is_final(worker.profile):
+            return
+        self.main_window.show_section_suggestions(worker.profile, suggestions)
+        self.refinement.draft_shown(worker.profile)
+
+    def on_profile_suggestions_ready(self, suggestions: list):
+        worker = self.sender()
+        if worker not in self.profile_workers:
+            return
+        self.main_window.show_section_suggestions(worker.profile, suggestions)
+        self.refinement.final_shown(worker.profile)
+
+    def on_profile_suggestion_error(self, text: str):
+        worker = self.sender()
+        if worker not in self.profile_workers:
+            return
+        self.main_window.show_section_error(worker.profile, text)
 
     def on_suggestions_ready(self, suggestions: list):
+        # 连续触发时只显示最后一次的结果
+        if self.sender() is not self.worker:
+            return
+        if self.refinement.has_draft():
+            # 原位替换草稿，不打断用户的键盘选择
+            self.main_window.refine_suggestions(suggestions)
+        else:
+            self.main_window.show_suggestions(suggestions)
+        self.refinement.final_shown()
+
+    def on_draft_ready(self, suggestions: list):
+        if self.sender() is not self.draft_worker or self.refinement.is_final():
+            return
         self.main_window.show_suggestions(suggestions)
+        self.main_window.show_status("草稿建议，正在生成更优结果...")
+        self.refinement.draft_shown()
+
+    def on_suggestion_picked(self, section=None):
+        self.refinement.picked(section)
 
     def on_suggestion_error(self, text: str):
+        if self.sender() is not self.worker:
+            return
+        if self.refinement.has_draft():
+            text = f"{text}（保留草稿建议）"
         self.main_window.show_status(text, True)
 
+    def reload_advisor(self):
+        """配置变更后重新创建建议提供者"""
+        self.build_advisors()
+        if self.engine_client:
+            try:
+                self.engine_client.reload()
+            except (OSError, ValueError) as e:
+                logging.warning(f"通知建议引擎重新加载失败: {str(e)}")
+        logging.info("建议提供者已重新加载")
+
     def get_suggestions(self):
         """调用API获取建议"""
         try:
@@ -160,15 +431,8 @@ class TextEnhancerApp(QApplication):
             logging.error(error_msg, exc_info=True)
 
     def get_openai_suggestions(self) -> Optional[List[str]]:
-        api_key = self.config.get("openai", "api_key")
-        model = self.config.get("openai", "model")
-        temperature = self.config.getfloat("openai", "temperature")
-        base_url = self.config.get("openai", "endpoint")
-        prompt = self.config.get("settings", "prompt")
-        prompt = prompt.replace("<text>", self.selected_text)
-        openai_advisor = OpenAIAdvisor(api_key, model, temperature, base_url, prompt)
         try:
-            suggestions = openai_advisor.get_text_suggestions(self.selected_text)
+            suggestions = self.advisor.get_text_suggestions(self.selected_text)
             logging.info(f"建议：{str(suggestions)}")
             return suggestions
         except Exception as e:
@@ -193,22 +457,15 @@ class SuggestionWorker(QThread):
     finished = pyqtSignal(list)
     error = pyqtSignal(str)
 
-    def __init__(self, selected_text, config):
+    def __init__(self, selected_text, advisor, profile=None):
         super().__init__()
         self.selected_text = selected_text
-        self.config = config
+        self.advisor = advisor
+        self.profile = profile
 
     def run(self):
         try:
-            api_key = self.config.get("openai", "api_key")
-            model = self.config.get("openai", "model")
-            temperature = self.config.getfloat("openai", "temperature")
-            base_url = self.config.get("openai", "endpoint")
-            prompt = self.config.get("settings", "prompt")
-            prompt = prompt.replace("<text>", self.selected_text)
-
-            openai_advisor = OpenAIAdvisor(api_key, model, temperature, base_url, prompt)
-            suggestions = openai_advisor.get_text_suggestions(self.selected_text)
+            suggestions = self.advisor.get_text_suggestions(self.selected_text)
             self.finished.emit(suggestions)
         except Exception as e:
             self.error.emit(str(e))
@@ -0,0 +1,134 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer, QThread
+from PyQt5.QtWidgets import QApplication
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def get_rss() -> Optional[int]:
+    """获取当前进程的常驻内存（字节），无法获取时返回None"""
+    try:
+        if psutil is not None:
+            return psutil.Process(os.getpid()).memory_info().rss
+        if os.path.exists("/proc/self/statm"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        if sys.platform != "win32":
+            import resource
+            # 只能拿到峰值，Linux单位为KB，macOS为字节
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+    except Exception as e:
+        logging.debug(f"读取内存占用失败: {str(e)}")
+    return None
+
+
+# 长时间运行时的内存监控，定期采样并在增长超过阈值时告警
+class MemoryMonitor(QObject):
+
+    def __init__(self, interval_sec=60, rss_growth_mb=100, widget_limit=500, thread_limit=20, top_stats=10):
+        super().__init__()
+        self.rss_growth = int(rss_growth_mb) * 1024 * 1024
+        self.widget_limit = int(widget_limit)
+        self.thread_limit = int(thread_limit)
+        self.top_stats = int(top_stats)
+        self.counters: Dict[str, Callable[[], object]] = {}
+        self.baseline_rss = None
+        self.last_sample = {}
+        self._warned_rss = 0
+        self._warned_widgets = 0
+        self._warned_threads = 0
+        self._snapshot = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(max(int(float(interval_sec) * 1000), 1000))
+        self.timer.timeout.connect(self.sample)
+
+    def register_counter(self, name: str, counter: Callable[[], object]):
+        """注册缓存等对象的计数函数，采样时一并记录"""
+        self.counters[name] = counter
+
+    def start(self):
+        self.sample()
+        self.timer.start()
+        logging.info("内存监控已启动")
+
+    def stop(self):
+        self.timer.stop()
+
+    def collect(self) -> dict:
+        """收集一次采样数据"""
+        widgets = QApplication.allWidgets()
+        objects = gc.get_objects()
+        sample = {
+            "rss": get_rss(),
+            "widgets": len(widgets),
+            "hidden_widgets": sum(1 for w in widgets if w.isHidden()),
+            "qthreads": sum(1 for o in objects if isinstance(o, QThread)),
+            "py_threads": threading.active_count(),
+            "gc_objects": len(objects),
+        }
+        for name, counter in self.counters.items():
+            try:
+                sample[name] = counter()
+            except Exception as e:
+                logging.debug(f"计数器 {name} 采样失败: {str(e)}")
+        return sample
+
+    def sample(self):
+        try:
+            sample = self.collect()
+            self.last_sample = sample
+            logging.debug(f"内存采样: {sample}")
+
+            rss = sample["rss"]
+            if rss is not None:
+                if self.baseline_rss is None:
+                    self.baseline_rss = rss
+                growth = rss - self.baseline_rss
+                # 每多增长一个阈值告警一次，避免刷屏
+                if self.rss_growth > 0 and growth >= self.rss_growth * (self._warned_rss + 1):
+                    self._warned_rss = growth // self.rss_growth
+                    logging.warning(f"内存占用持续增长: 当前 {rss / 1024 / 1024:.1f}MB，"
+                                    f"较启动时增加 {growth / 1024 / 1024:.1f}MB，采样: {sample}")
+
+            if self.widget_limit > 0 and sample["widgets"] >= self.widget_limit * (self._warned_widgets + 1):
+                self._warned_widgets = sample["widgets"] // self.widget_limit
+                logging.warning(f"QWidget数量过多: {sample['widgets']}，"
+                                f"其中隐藏 {sample['hidden_widgets']}，可能存在未释放的控件")
+
+            if self.thread_limit > 0 and sample["qthreads"] >= self.thread_limit * (self._warned_threads + 1):
+                self._warned_threads = sample["qthreads"] // self.thread_limit
+                logging.warning(f"QThread对象数量过多: {sample['qthreads']}，可能存在未释放的工作线程")
+        except Exception as e:
+            logging.error(f"内存采样出错: {str(e)}", exc_info=True)
+
+    def snapshot(self) -> str:
+        """拍摄tracemalloc快照并与上一次对比，首次调用只记录基线"""
+        if not tracemalloc.is_tracing() or self._snapshot is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+            message = "已开启tracemalloc并记录基线快照，再次执行可查看内存增长"
+            logging.info(message)
+            return message
+
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+
+        lines = [f"内存快照对比（前 {self.top_stats} 项）:"]
+        lines += [str(stat) for stat in stats[:self.top_stats]]
+        message = "\n".join(lines)
+        logging.warning(message)
+        return message
@@ -0,0 +1,178 @@
+import logging
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Advisors.CachingAdvisor import normalize_text
+from Advisors.RoutingAdvisor import CJK_PATTERN
+
+SKIP = "skip"
+LOCAL = "local"
+API = "api"
+
+URL_PATTERN = re.compile(r"^(https?|ftp)://\S+$|^www\.\S+\.\S+$", re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r"^[\w.+-]+@[\w-]+(\.[\w-]+)+$")
+# Windows路径常含空格；POSIX风格的路径遇到空白即结束，“/usr/bin is a dir”是句子
+PATH_PATTERN = re.compile(r"^([A-Za-z]:[\\/]|\\\\|\.{1,2}\\)[^\n]*$|^(~?/|\.{1,2}/)\S*$")
+NUMBER_PATTERN = re.compile(r"^[\s+\-$¥€£%.,:/()\d]+$")
+PUNCTUATION_PATTERN = re.compile(r"^[\W_]+$")
+SINGLE_WORD_PATTERN = re.compile(r"^[A-Za-z][\w'-]*$")
+CODE_FENCE = "```"
+CODE_LINE_PATTERN = re.compile(
+    r"[{}]\s*$|^\s*</?[A-Za-z][\w-]*[^>]*>\s*$"
+    r"|^\s*(def|class|function|import|from|return|var|let|const|#include)\b.*[(){}:;=]\s*$"
+)
+# 括号和分号在正文中也很常见，需要赋值、比较或紧贴标识符的调用才算代码
+CODE_CALL_PATTERN = re.compile(r"[A-Za-z_][\w.]*\(")
+CODE_OPERATOR_PATTERN = re.compile(r"[\w)\]]\s*([+\-*/]?=|==|!=|=>)\s*\S")
+CODE_SYMBOLS = "{}[]();=<>"
+BRACKET_PAIRS = {"(": ")", "[": "]", "{": "}"}
+
+
+class Decision:
+    def __init__(self, action: str, reason: str, suggestions: Optional[List[str]] = None):
+        self.action = action
+        self.reason = reason
+        self.suggestions = suggestions
+
+
+Rule = Callable[[str], Optional[Decision]]
+
+
+def skip_punctuation(text: str) -> Optional[Decision]:
+    if PUNCTUATION_PATTERN.match(text):
+        return Decision(SKIP, "只有标点或符号")
+    return None
+
+
+def skip_number(text: str) -> Optional[Decision]:
+    if NUMBER_PATTERN.match(text):
+        return Decision(SKIP, "数字")
+    return None
+
+
+def skip_url(text: str) -> Optional[Decision]:
+    if URL_PATTERN.match(text) or EMAIL_PATTERN.match(text):
+        return Decision(SKIP, "网址或邮箱")
+    return None
+
+
+def skip_path(text: str) -> Optional[Decision]:
+    if "\n" not in text and PATH_PATTERN.match(text):
+        return Decision(SKIP, "文件路径")
+    return None
+
+
+def skip_single_word(text: str) -> Optional[Decision]:
+    if SINGLE_WORD_PATTERN.match(text) or (len(text) < 2 and CJK_PATTERN.match(text)):
+        return Decision(SKIP, "单个词语")
+    return None
+
+
+def brackets_balanced(text: str) -> bool:
+    stack = []
+    for char in text:
+        if char in BRACKET_PAIRS:
+            stack.append(BRACKET_PAIRS[char])
+        elif char in BRACKET_PAIRS.values():
+            if not stack or stack.pop() != char:
+                return False
+    return not stack
+
+
+def has_code_syntax(text: str) -> bool:
+    return bool(CODE_CALL_PATTERN.search(text) or CODE_OPERATOR_PATTERN.search(text))
+
+
+def is_code_line(line: str) -> bool:
+    if CODE_LINE_PATTERN.search(line):
+        return True
+    return line.rstrip().endswith(";") and has_code_syntax(line)
+
+
+def looks_like_code(text: str) -> bool:
+    """跳过的判断比路由更严格：代码块、多行代码，或括号配对且带有代码语法的单行语句"""
+    if CODE_FENCE in text:
+        return True
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        code_lines = sum(1 for line in lines if is_code_line(line))
+        return code_lines >= 2 and code_lines * 2 >= len(lines)
+    symbols = sum(1 for char in text if char in CODE_SYMBOLS)
+    if symbols < 3 or symbols / len(text) < 0.1 or not brackets_balanced(text):
+        return False
+    return "{" in text or "}" in text or (";" in text and has_code_syntax(text))
+
+
+def skip_code(text: str) -> Optional[Decision]:
+    if looks_like_code(text):
+        return Decision(SKIP, "代码或标记")
+    return None
+
+
+BUILTIN_RULES: Dict[str, Rule] = {
+    "punctuation": skip_punctuation,
+    "number": skip_number,
+    "url": skip_url,
+    "path": skip_path,
+    "single_word": skip_single_word,
+    "code": skip_code,
+}
+
+
+# 发送请求前的本地过滤：跳过无需润色的内容，命中缓存的直接返回
+class PreFilter:
+
+    def __init__(self, rules: Optional[List[str]] = None, lookup: Optional[Callable[[str], Optional[List[str]]]] = None):
+        names = BUILTIN_RULES.keys() if rules is None else rules
+        self.rules: List[Tuple[str, Rule]] = []
+        for name in names:
+            if name in BUILTIN_RULES:
+                self.rules.append((name, BUILTIN_RULES[name]))
+            else:
+                logging.warning(f"未知的过滤规则: {name}")
+        self.lookup = lookup
+        self.counts = Counter()
+
+    def add_rule(self, name: str, rule: Rule):
+        """注册自定义规则，规则返回None表示不处理"""
+        self.rules.append((name, rule))
+
+    def check(self, text: str) -> Tuple[str, Decision]:
+        """返回规范化后的文本和处理决定"""
+        text = normalize_text(text)
+        decision = None
+        for name, rule in self.rules:
+            try:
+                decision = rule(text)
+            except Exception as e:
+                logging.error(f"过滤规则 {name} 出错: {str(e)}")
+                continue
+            if decision:
+                decision.reason = f"{name}: {decision.reason}"
+                break
+
+        if decision is None and self.lookup:
+            suggestions = self.lookup(text)
+            if suggestions:
+                decision = Decision(LOCAL, "cache: 命中缓存", suggestions)
+
+        decision = decision or Decision(API, "")
+        # 缓存结果由调用方实际使用后再通过record_local计数
+        if decision.action != LOCAL:
+            self.counts[decision.action] += 1
+        if decision.action == SKIP:
+            logging.info(f"本地过滤: {decision.action} ({decision.reason})，已避免 {self.avoided} 次API调用")
+        return text, decision
+
+    def record_local(self):
+        """本地结果已展示给用户，计为一次避免的API调用"""
+        self.counts[LOCAL] += 1
+        logging.info(f"本地过滤: {LOCAL} (cache: 命中缓存)，已避免 {self.avoided} 次API调用")
+
+    @property
+    def avoided(self) -> int:
+        return self.counts[SKIP] + self.counts[LOCAL]
+
+    def get_stats(self) -> dict:
+        return dict(self.counts, avoided=self.avoided)
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Iterable, Optional
+
+
+# 统计先显示草稿、再替换为最终结果的效果
+class RefinementTracker:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._draft_at = {}
+        self._final_at = {}
+        self.presses = 0
+        self.drafts_shown = 0
+        self.drafts_replaced = 0
+        self.finals_first = 0
+        self.draft_picks = 0
+        self.final_picks = 0
+        self.total_lead = 0.0
+
+    def start(self, keys: Iterable[Optional[str]] = (None,)):
+        """新的一次按键，keys为各分组（单一提示词时为None）"""
+        with self._lock:
+            self.presses += 1
+            self._draft_at = {key: None for key in keys}
+            self._final_at = {key: None for key in keys}
+
+    def has_draft(self, key=None) -> bool:
+        return self._draft_at.get(key) is not None
+
+    def is_final(self, key=None) -> bool:
+        return self._final_at.get(key) is not None
+
+    def draft_shown(self, key=None):
+        with self._lock:
+            self._draft_at[key] = time.perf_counter()
+            self.drafts_shown += 1
+
+    def final_shown(self, key=None):
+        with self._lock:
+            now = time.perf_counter()
+            self._final_at[key] = now
+            draft_at = self._draft_at.get(key)
+            if draft_at is None:
+                self.finals_first += 1
+            else:
+                self.drafts_replaced += 1
+                self.total_lead += now - draft_at
+
+    def picked(self, key=None):
+        with self._lock:
+            if self._draft_at.get(key) is not None and self._final_at.get(key) is None:
+                self.draft_picks += 1
+            else:
+                self.final_picks += 1
+
+    def get_stats(self) -> dict:
+        picks = self.draft_picks + self.final_picks
+        return {
+            "presses": self.presses,
+            "drafts_shown": self.drafts_shown,
+            "drafts_replaced": self.drafts_replaced,
+            "finals_first": self.finals_first,
+            "draft_picks": self.draft_picks,
+            "final_picks": self.final_picks,
+            "draft_pick_rate": round(self.draft_picks / picks, 3) if picks else None,
+            "avg_draft_lead_ms": round(self.total_lead / self.drafts_replaced * 1000) if self.drafts_replaced else None,
+        }
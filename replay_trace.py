@@ -0,0 +1,198 @@
+"""回放会话记录，按真实的按键节奏压测建议接口
+
+用法:
+    python replay_trace.py text_enhancer_trace.jsonl --speed 10
+    python replay_trace.py text_enhancer_trace.jsonl --stub --stub-latency-ms 400 --ui
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Advisors.AdvisorFactory import create_advisor
+from configurable.config import get_config
+from logger import setup_logging
+from session_trace import load_trace, press_schedule, synthesize_text
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """兼容OpenAI聊天接口的本地桩服务，固定延迟后返回假建议"""
+    latency = 0.3
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        time.sleep(self.latency)
+
+        content = "\n".join(f"建议{i}" for i in range(1, 4))
+        # 批量请求需要按id返回JSON
+        start = prompt.rfind("[")
+        if start >= 0:
+            try:
+                items = json.loads(prompt[start:])
+                content = json.dumps({str(item["id"]): [f"建议{i}" for i in range(1, 4)] for item in items},
+                                     ensure_ascii=False)
+            except (ValueError, TypeError, KeyError):
+                pass
+
+        payload = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(latency_ms: float) -> str:
+    StubHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+class ReplayHost:
+    """无界面回放时代替TextEnhancerApp提供给MainInterface的宿主"""
+
+    def __init__(self):
+        from WorkerSignals import WorkerSignals
+        self.signals = WorkerSignals()
+        self.trace_recorder = None
+        self.hotkey_pressed_at = None
+
+    def show_config_window(self):
+        pass
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def replay(events, advisor, speed=1.0, concurrency=16, host=None, app=None, max_gap=None) -> dict:
+    presses = press_schedule(events, max_gap)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def run(text):
+        start = time.perf_counter()
+        try:
+            suggestions = advisor.get_text_suggestions(text)
+            if host:
+                host.signals.show_suggestions.emit(suggestions)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        base = presses[0][0] if presses else 0
+        for at, event in presses:
+            delay = (at - base) / speed - (time.perf_counter() - started)
+            wait_until = time.perf_counter() + max(delay, 0)
+            while time.perf_counter() < wait_until:
+                if app:
+                    app.processEvents()
+                time.sleep(min(0.005, max(wait_until - time.perf_counter(), 0)))
+            text = synthesize_text(event)
+            if host:
+                host.hotkey_pressed_at = time.perf_counter()
+                host.signals.getting_suggestions.emit(text)
+            futures.append(pool.submit(run, text))
+
+        while app and not all(f.done() for f in futures):
+            app.processEvents()
+            time.sleep(0.005)
+    if app:
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(presses),
+        "succeeded": len(latencies),
+        "failed": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000) if latencies else None,
+            "p50": round(percentile(latencies, 0.5) * 1000) if latencies else None,
+            "p90": round(percentile(latencies, 0.9) * 1000) if latencies else None,
+            "p99": round(percentile(latencies, 0.99) * 1000) if latencies else None,
+            "max": round(max(latencies) * 1000) if latencies else None,
+        },
+        "recorded_picks": sum(1 for e in events if e.get("event") == "pick"),
+        "advisor": advisor.get_stats(),
+        "errors": sorted(set(errors))[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放会话记录并统计延迟和吞吐")
+    parser.add_argument("trace", help="会话记录文件")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速")
+    parser.add_argument("--concurrency", type=int, default=16, help="最大并发请求数")
+    parser.add_argument("--endpoint", help="覆盖配置中的接入点")
+    parser.add_argument("--model", help="覆盖配置中的模型")
+    parser.add_argument("--api-key", help="覆盖配置中的API密钥")
+    parser.add_argument("--stub", action="store_true", help="使用本地桩服务代替真实接口")
+    parser.add_argument("--stub-latency-ms", type=float, default=300, help="桩服务的响应延迟")
+    parser.add_argument("--ui", action="store_true", help="同时以无界面模式驱动弹窗")
+    parser.add_argument("--max-session-gap", type=float, default=5.0, help="多次会话之间最多等待的秒数")
+    args = parser.parse_args()
+
+    setup_logging()
+    config = get_config()
+    if args.stub:
+        config.set("openai", "endpoint", start_stub(args.stub_latency_ms))
+        config.set("openai", "api_key", args.api_key or "stub")
+    if args.endpoint:
+        config.set("openai", "endpoint", args.endpoint)
+    if args.stub or args.endpoint:
+        # 指定的接入点优先，不能被测速自动选出的接入点覆盖
+        config.set("probe", "auto_select", "false")
+    if args.model:
+        config.set("openai", "model", args.model)
+    if args.api_key:
+        config.set("openai", "api_key", args.api_key)
+
+    app = host = None
+    if args.ui:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        from src.main_interface import MainInterface
+        app = QApplication(sys.argv[:1])
+        host = ReplayHost()
+        host.main_window = MainInterface(main_app=host)
+
+    events = load_trace(args.trace)
+    # 回放不读写团队共享缓存，桩服务的假建议不能进入生产命名空间
+    advisor = create_advisor(config, shared=False)
+    report = replay(events, advisor, args.speed, args.concurrency, host, app, args.max_session_gap)
+    logging.info("回放完成")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
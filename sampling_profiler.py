@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+Frame = Tuple[str, str, int]
+
+
+class _Session:
+    """一次采样的数据，开关交替很快时新旧采样线程互不影响"""
+
+    def __init__(self):
+        self.stacks: Dict[str, Counter] = {}
+        self.stop = threading.Event()
+        self.started_at = time.time()
+        self.samples = 0
+        self.thread: Optional[threading.Thread] = None
+
+
+# 定时抓取所有线程的调用栈，开销低，可以在运行中随时开关
+class SamplingProfiler:
+
+    def __init__(self, interval_ms=10, output_dir="profiles", max_duration_sec=600, max_depth=64, formats=None):
+        self.interval = max(float(interval_ms), 1) / 1000
+        self.output_dir = output_dir
+        self.max_duration = float(max_duration_sec)
+        self.max_depth = int(max_depth)
+        self.formats = formats or ["collapsed", "speedscope"]
+        self._session: Optional[_Session] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        session = self._session
+        return session is not None and session.thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            session = _Session()
+            session.thread = threading.Thread(target=self._run, args=(session,), name="SamplingProfiler", daemon=True)
+            self._session = session
+            session.thread.start()
+        logging.info(f"性能采样已开始，间隔 {self.interval * 1000:.0f}ms")
+
+    def stop(self) -> List[str]:
+        """停止采样并写出结果，返回生成的文件"""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is None:
+            return []
+        session.stop.set()
+        # 在锁外等待，采样线程可能正在争用锁以自动停止
+        session.thread.join()
+        return self.write(session)
+
+    def toggle(self) -> List[str]:
+        if self.running:
+            return self.stop()
+        self.start()
+        return []
+
+    def _run(self, session: _Session):
+        me = threading.get_ident()
+        deadline = time.perf_counter() + self.max_duration if self.max_duration > 0 else None
+        while not session.stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                stack.reverse()
+                name = names.get(ident, f"Thread-{ident}")
+                session.stacks.setdefault(name, Counter())[tuple(stack)] += 1
+            session.samples += 1
+            if deadline and time.perf_counter() > deadline:
+                with self._lock:
+                    if self._session is not session:
+                        # 已被stop接管，由它负责写出
+                        return
+                    self._session = None
+                logging.warning("性能采样达到最长时长，自动停止")
+                session.stop.set()
+                self.write(session)
+                return
+
+    @staticmethod
+    def _frame_name(frame: Frame) -> str:
+        name, filename, line = frame
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def to_collapsed(self, session: _Session) -> str:
+        lines = []
+        for thread, stacks in session.stacks.items():
+            for stack, count in stacks.items():
+                frames = [thread.replace(";", "_")] + [self._frame_name(f).replace(";", "_") for f in stack]
+                lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, session: _Session) -> dict:
+        frames: List[dict] = []
+        index: Dict[Frame, int] = {}
+        profiles = []
+        weight = self.interval * 1000
+        for thread, stacks in session.stacks.items():
+            samples, weights = [], []
+            for stack, count in stacks.items():
+                sample = []
+                for frame in stack:
+                    if frame not in index:
+                        index[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    sample.append(index[frame])
+                samples.append(sample)
+                weights.append(count * weight)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": "text_enhancer",
+            "exporter": "text_enhancer sampling profiler",
+        }
+
+    def write(self, session: _Session) -> List[str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(session.started_at))
+        base = os.path.join(self.output_dir, f"profile-{stamp}")
+        paths = []
+        try:
+            if "collapsed" in self.formats:
+                with open(base + ".collapsed.txt", "w", encoding="utf-8") as f:
+                    f.write(self.to_collapsed(session))
+                paths.append(base + ".collapsed.txt")
+            if "speedscope" in self.formats:
+                with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+                    json.dump(self.to_speedscope(session), f)
+                paths.append(base + ".speedscope.json")
+            logging.info(f"性能采样已停止，共 {session.samples} 次采样，结果: {', '.join(paths)}")
+        except Exception as e:
+            logging.error(f"写出性能采样结果失败: {str(e)}")
+        return paths
+
+    def status(self) -> Optional[str]:
+        session = self._session
+        if session is None or not session.thread.is_alive():
+            return None
+        return f"性能采样中：已采样 {session.samples} 次，持续 {time.time() - session.started_at:.0f} 秒"
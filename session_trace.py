@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+from typing import Optional, List, Tuple
+
+from Advisors.RoutingAdvisor import analyze_text
+
+TRACE_VERSION = 1
+
+
+def text_digest(text: str, salt: str = "") -> str:
+    """加盐后常见短句无法通过查表还原，同一份记录内相同文本的id仍然一致"""
+    return hashlib.sha1(f"{salt}{text}".encode("utf-8")).hexdigest()[:12]
+
+
+# 记录真实使用过程（按键、API调用、选择建议），供压测回放
+class TraceRecorder:
+
+    def __init__(self, path: str, redact=True):
+        self.path = path
+        self.redact = redact
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._file = open(path, "a", encoding="utf-8")
+        self._shown_at = None
+        self.salt = secrets.token_hex(8)
+        self._write({"event": "start", "version": TRACE_VERSION, "wall_time": time.time(), "redact": redact,
+                     "salt": self.salt})
+        logging.info(f"会话记录已开启: {path}")
+
+    def _write(self, record: dict):
+        record["t"] = round(time.perf_counter() - self._start, 4)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _describe_text(self, text: str) -> dict:
+        features = analyze_text(text)
+        record = {
+            "id": text_digest(text, self.salt),
+            "chars": len(text),
+            "tokens": features["tokens"],
+            "language": features["language"],
+            "code": features["code"],
+        }
+        if not self.redact:
+            record["text"] = text
+        return record
+
+    def record_press(self, text: str):
+        self._write(dict(self._describe_text(text), event="press"))
+
+    def record_advise(self, text: str, latency: float, count: int, error: Optional[str] = None):
+        record = {"event": "advise", "id": text_digest(text, self.salt), "latency": round(latency, 4), "count": count}
+        if error:
+            record["error"] = error
+        self._write(record)
+        self._shown_at = time.perf_counter()
+
+    def record_pick(self, index: int):
+        delay = time.perf_counter() - self._shown_at if self._shown_at else None
+        self._write({"event": "pick", "index": index, "delay": round(delay, 4) if delay is not None else None})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load_trace(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def press_schedule(events: List[dict], max_gap: Optional[float] = None) -> List[Tuple[float, dict]]:
+    """把文件中多次会话的按键换算到同一时间轴
+
+    每次会话的t都从0开始，按start事件的wall_time错开；max_gap限制会话之间的空闲时间，避免回放时长时间等待。
+    """
+    schedule = []
+    first_wall = None
+    offset = 0.0
+    last = 0.0
+    for event in events:
+        if event.get("event") == "start":
+            wall_time = event.get("wall_time")
+            if first_wall is None:
+                first_wall = wall_time
+            offset = wall_time - first_wall if wall_time is not None and first_wall is not None else last
+            if max_gap is not None:
+                offset = min(offset, last + max_gap)
+            offset = max(offset, 0.0)
+        elif event.get("event") == "press":
+            at = offset + event.get("t", 0)
+            last = max(last, at)
+            schedule.append((at, event))
+        else:
+            last = max(last, offset + event.get("t", 0))
+    schedule.sort(key=lambda item: item[0])
+    return schedule
+
+
+def synthesize_text(record: dict) -> str:
+    """为脱敏记录生成长度和语言相近的替代文本，以记录id开头，原文相同的按键仍得到相同文本"""
+    if record.get("text"):
+        return record["text"]
+    chars = max(int(record.get("chars", 10)), 1)
+    if record.get("language") == "zh":
+        base = "这是一段用于回放测试的示例文本，内容仅用于模拟真实长度。"
+    else:
+        base = "This is sample text used to replay a recorded session at realistic length. "
+    text = f"{record.get('id', '')} " + base * (chars // len(base) + 1)
+    return text[:chars]
@@ -1,10 +1,13 @@
 import logging
+import time
 
 import pyperclip
-from PyQt5.QtCore import Qt, pyqtSlot, QRectF
+from PyQt5.QtCore import Qt, pyqtSlot, QRectF, QTimer
 from PyQt5.QtGui import QCursor, QColor, QPainterPath, QPainter
-from PyQt5.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QWidget, QFrame, QLabel, QTextEdit, QDesktopWidget, \
-    QHBoxLayout, QGraphicsDropShadowEffect
+from PyQt5.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QWidget, QFrame, QLabel, QTextEdit, \
+    QHBoxLayout, QGraphicsDropShadowEffect, QApplication
+
+from configurable.config import get_config
 
 
 class MainInterface(QMainWindow):
@@ -18,7 +21,12 @@ class MainInterface(QMainWindow):
         self.suggestions_layout = None
         self.suggestions_frame = None
         self.main_frame = None
+        self.loading_label = None
         self.main_app = main_app
+        self.first_paint_budget = get_config().getfloat("settings", "first_paint_budget_ms", fallback=50) / 1000
+        self._paint_requested_at = None
+        self._adjust_pending = False
+        self._screen_geometry_cache = {}
 
         # 设置无边框和背景透明
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -29,9 +37,22 @@ class MainInterface(QMainWindow):
         self.main_app.signals.getting_suggestions.connect(self.getting_suggestions)
         self.main_app.signals.show_status.connect(self.show_status)
         self.main_app.signals.show_suggestions.connect(self.show_suggestions)
+        self.main_app.signals.show_sections.connect(self.show_sections)
 
         self.current_selected_index = -1  # 当前选中按钮的索引
         self.suggestion_buttons = []  # 存储所有建议按钮
+        self.sections = {}  # 多风格时每个风格的分组
+
+        # 屏幕变化时清空几何信息缓存
+        app = QApplication.instance()
+        app.screenAdded.connect(self.invalidate_screen_cache)
+        app.screenRemoved.connect(self.invalidate_screen_cache)
+        for screen in app.screens():
+            screen.availableGeometryChanged.connect(self.invalidate_screen_cache)
+
+        # 提前创建原生窗口并完成样式计算，首次弹出时无需再初始化
+        self.ensurePolished()
+        self.create()
 
     def init_ui(self):
         self.setWindowTitle('文本增强')
@@ -89,6 +110,12 @@ class MainInterface(QMainWindow):
         self.suggestions_frame.setLayout(self.suggestions_layout)
         self.layout.addWidget(self.suggestions_frame)
 
+        # 加载提示，常驻并复用
+        self.loading_label = QLabel("正在生成建议...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        self.loading_label.hide()
+        self.layout.addWidget(self.loading_label)
+
         # 状态标签
         self.status_label = QLabel("就绪")
         self.status_label.setStyleSheet("color: gray;")
@@ -166,6 +193,8 @@ class MainInterface(QMainWindow):
 
     def paintEvent(self, event):
         """绘制圆角窗口"""
+        if self._paint_requested_at is not None:
+            self.report_first_paint()
         path = QPainterPath()
         rect = self.rect()  # 获取QRect
         rectf = QRectF(rect)  # 转换为QRectF
@@ -179,6 +208,20 @@ class MainInterface(QMainWindow):
 
         painter.end()
 
+    def report_first_paint(self):
+        """记录从快捷键触发到首次绘制的耗时"""
+        now = time.perf_counter()
+        render = now - self._paint_requested_at
+        self._paint_requested_at = None
+
+        hotkey_at = getattr(self.main_app, "hotkey_pressed_at", None)
+        total = f"，距快捷键触发 {(now - hotkey_at) * 1000:.0f}ms" if hotkey_at else ""
+        message = f"弹窗首次绘制耗时 {render * 1000:.0f}ms{total}"
+        if render > self.first_paint_budget:
+            logging.warning(f"{message}，超出预算 {self.first_paint_budget * 1000:.0f}ms")
+        else:
+            logging.debug(message)
+
     def open_config_dialog(self):
         self.main_app.show_config_window()
 
@@ -186,18 +229,20 @@ class MainInterface(QMainWindow):
     def getting_suggestions(self, text: str):
         """显示窗口并设置文本"""
         try:
-            self.original_text.clear()
-            self.original_text.setText(text)
-            self.clear_suggestions()
+            self._paint_requested_at = time.perf_counter()
+            self.setUpdatesEnabled(False)
+            try:
+                self.original_text.setPlainText(text)
+                self.clear_suggestions()
+                self.loading_label.show()
+            finally:
+                self.setUpdatesEnabled(True)
 
             logging.info("正在生成建议...")
-            loading_label = QLabel("正在生成建议...")
-            loading_label.setAlignment(Qt.AlignCenter)
-            self.suggestions_layout.addWidget(loading_label)
-
-            self.show_window()
 
+            # 先定位再显示，避免窗口在旧位置闪现
             self.position_window_near_cursor()
+            self.show_window()
 
         except Exception as e:
             logging.error(f"显示窗口时出错: {str(e)}")
@@ -210,9 +255,7 @@ class MainInterface(QMainWindow):
             x, y = cursor_pos.x(), cursor_pos.y()
             logging.debug(f"光标位置: {x}, {y}")
 
-            screen_geometry = QDesktopWidget().availableGeometry()
-            screen_width = screen_geometry.width()
-            screen_height = screen_geometry.height()
+            screen_geometry = self.screen_geometry_at(cursor_pos)
 
             window_width = self.width()
             window_height = self.height()
@@ -220,10 +263,12 @@ class MainInterface(QMainWindow):
             new_x = x + 20
             new_y = y + 20
 
-            if new_x + window_width > screen_width:
+            if new_x + window_width > screen_geometry.right():
                 new_x = x - window_width - 20
-            if new_y + window_height > screen_height:
+            if new_y + window_height > screen_geometry.bottom():
                 new_y = y - window_height - 20
+            new_x = max(new_x, screen_geometry.left())
+            new_y = max(new_y, screen_geometry.top())
 
             self.move(new_x, new_y)
             logging.debug(f"窗口位置设置为: {new_x}, {new_y}")
@@ -231,42 +276,78 @@ class MainInterface(QMainWindow):
             logging.error(f"定位窗口时出错: {str(e)}")
             raise
 
+    def screen_geometry_at(self, pos):
+        """获取光标所在屏幕的可用区域，按屏幕缓存"""
+        screen = QApplication.screenAt(pos) or QApplication.primaryScreen()
+        name = screen.name()
+        geometry = self._screen_geometry_cache.get(name)
+        if geometry is None:
+            geometry = screen.availableGeometry()
+            self._screen_geometry_cache[name] = geometry
+        return geometry
+
+    def invalidate_screen_cache(self, *args):
+        self._screen_geometry_cache.clear()
+        app = QApplication.instance()
+        for screen in app.screens():
+            try:
+                screen.availableGeometryChanged.disconnect(self.invalidate_screen_cache)
+            except TypeError:
+                pass
+            screen.availableGeometryChanged.connect(self.invalidate_screen_cache)
+
+    def schedule_adjust_size(self):
+        """合并同一轮事件中的多次尺寸调整，只做一次布局"""
+        if not self._adjust_pending:
+            self._adjust_pending = True
+            QTimer.singleShot(0, self._adjust_size)
+
+    def _adjust_size(self):
+        self._adjust_pending = False
+        self.adjustSize()
+
+    def create_suggestion_button(self, suggestion: str, i: int):
+        """创建单条建议按钮，返回(容器, 按钮)"""
+        h_layout = QHBoxLayout()
+
+        # 创建建议按钮
+        btn = QPushButton(suggestion)
+        btn.setObjectName(f"suggestionBtn_{i}")
+        btn.setStyleSheet("""
+            QPushButton {
+                text-align: left;
+                padding: 5px;
+                border: 1px solid #ccc;
+                border-radius: 3px;
+                background: white;
+            }
+            QPushButton:hover {
+                background-color: #f0f0f0;
+            }
+            QPushButton:focus {
+                background-color: #e0e0e0;
+                border: 1px solid #999;
+            }
+        """)
+        # 读取按钮当前文本，草稿被原位替换后仍然正确
+        btn.clicked.connect(lambda _, b=btn: self.pick_suggestion(b.text()))
+
+        h_layout.addWidget(btn)
+        widget = QWidget()
+        widget.setLayout(h_layout)
+        return widget, btn
+
     @pyqtSlot(list)
     def show_suggestions(self, suggestions: list):
         """在UI中显示建议"""
         try:
+            self.setUpdatesEnabled(False)
             self.clear_suggestions()
-            self.suggestion_buttons.clear()
-            self.current_selected_index = -1
 
             for i, suggestion in enumerate(suggestions, 1):
-                h_layout = QHBoxLayout()
-
-                # 创建建议按钮
-                btn = QPushButton(suggestion)
-                btn.setObjectName(f"suggestionBtn_{i}")
-                btn.setStyleSheet("""
-                    QPushButton {
-                        text-align: left;
-                        padding: 5px;
-                        border: 1px solid #ccc;
-                        border-radius: 3px;
-                        background: white;
-                    }
-                    QPushButton:hover {
-                        background-color: #f0f0f0;
-                    }
-                    QPushButton:focus {
-                        background-color: #e0e0e0;
-                        border: 1px solid #999;
-                    }
-                """)
-                btn.clicked.connect(lambda _, s=suggestion: self.pick_suggestion(s))
+                widget, btn = self.create_suggestion_button(suggestion, i)
 
                 # 添加到布局
-                h_layout.addWidget(btn)
-                widget = QWidget()
-                widget.setLayout(h_layout)
                 self.suggestions_layout.addWidget(widget)
 
                 # 存储按钮引用
@@ -276,11 +357,121 @@ class MainInterface(QMainWindow):
             if self.suggestion_buttons:
                 self.select_suggestion(0)
 
-            self.adjustSize()
+            self.schedule_adjust_size()
 
         except Exception as e:
             logging.error(f"显示建议时出错: {str(e)}")
             raise
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def refine_suggestions(self, suggestions: list):
+        """用最终结果原位替换草稿，保持当前选中的行"""
+        if not self.suggestion_buttons:
+            self.show_suggestions(suggestions)
+            return
+        try:
+            self.setUpdatesEnabled(False)
+            for i, suggestion in enumerate(suggestions):
+                if i < len(self.suggestion_buttons):
+                    self.suggestion_buttons[i].setText(suggestion)
+                else:
+                    widget, btn = self.create_suggestion_button(suggestion, i + 1)
+                    self.suggestions_layout.addWidget(widget)
+                    self.suggestion_buttons.append(btn)
+
+            # 最终结果比草稿少时移除多余的行
+            while len(self.suggestion_buttons) > max(len(suggestions), 1):
+                btn = self.suggestion_buttons.pop()
+                widget = btn.parentWidget()
+                self.suggestions_layout.removeWidget(widget)
+                widget.deleteLater()
+            if self.current_selected_index >= len(self.suggestion_buttons):
+                self.current_selected_index = -1
+                self.select_suggestion(len(self.suggestion_buttons) - 1)
+
+            self.show_status("建议已更新")
+        finally:
+            self.setUpdatesEnabled(True)
+
+    @pyqtSlot(list)
+    def show_sections(self, sections: list):
+        """为每个风格创建分组，结果到达后分别填充"""
+        try:
+            self.setUpdatesEnabled(False)
+            self.clear_suggestions()
+
+            for name, title in sections:
+                frame = QFrame()
+                layout = QVBoxLayout(frame)
+                layout.setContentsMargins(0, 0, 0, 0)
+                header = QLabel(title)
+                header.setStyleSheet("font-weight: bold; color: #555;")
+                layout.addWidget(header)
+                placeholder = QLabel("正在生成建议...")
+                placeholder.setStyleSheet("color: gray;")
+                layout.addWidget(placeholder)
+                self.suggestions_layout.addWidget(frame)
+                self.sections[name] = {"layout": layout, "widgets": [placeholder], "buttons": []}
+
+            self.schedule_adjust_size()
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _set_section_widgets(self, name: str, widgets: list, buttons: list):
+        """替换分组中的内容，保持用户当前的键盘选择"""
+        section = self.sections.get(name)
+        if section is None:
+            return
+
+        selected = None
+        if 0 <= self.current_selected_index < len(self.suggestion_buttons):
+            selected = self.suggestion_buttons[self.current_selected_index]
+        selected_in_section = section["buttons"].index(selected) if selected in section["buttons"] else None
+
+        for widget in section["widgets"]:
+            section["layout"].removeWidget(widget)
+            widget.deleteLater()
+        for widget in widgets:
+            section["layout"].addWidget(widget)
+        section["widgets"] = widgets
+        section["buttons"] = buttons
+
+        self.suggestion_buttons = [btn for s in self.sections.values() for btn in s["buttons"]]
+        if selected_in_section is not None:
+            # 被替换的行仍选中同一位置
+            self.current_selected_index = -1
+            if buttons:
+                self.select_suggestion(self.suggestion_buttons.index(buttons[min(selected_in_section, len(buttons) - 1)]))
+        elif selected is not None:
+            self.current_selected_index = self.suggestion_buttons.index(selected)
+        elif self.suggestion_buttons:
+            self.current_selected_index = -1
+            self.select_suggestion(0)
+
+    def show_section_suggestions(self, name: str, suggestions: list):
+        """填充某个分组的建议"""
+        try:
+            self.setUpdatesEnabled(False)
+            widgets, buttons = [], []
+            for i, suggestion in enumerate(suggestions, 1):
+                widget, btn = self.create_suggestion_button(suggestion, i)
+                widgets.append(widget)
+                buttons.append(btn)
+            self._set_section_widgets(name, widgets, buttons)
+            self.schedule_adjust_size()
+        except Exception as e:
+            logging.error(f"显示建议时出错: {str(e)}")
+            raise
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def show_section_error(self, name: str, message: str):
+        label = QLabel(message)
+        label.setStyleSheet("color: red;")
+        label.setWordWrap(True)
+        self._set_section_widgets(name, [label], [])
+        self.schedule_adjust_size()
 
     def select_suggestion(self, index):
         """选择指定索引的建议"""
@@ -320,6 +511,11 @@ class MainInterface(QMainWindow):
             self.hide()
             event.accept()
             return
+        # Ctrl+Shift+P 开关性能采样
+        if event.key() == Qt.Key_P and event.modifiers() == (Qt.ControlModifier | Qt.ShiftModifier):
+            self.show_status(self.main_app.toggle_profiler())
+            event.accept()
+            return
         # 只在有建议按钮且焦点不在输入框时处理
         if self.suggestion_buttons and not self.original_text.hasFocus():
             if event.key() == Qt.Key_Up:
@@ -343,7 +539,9 @@ class MainInterface(QMainWindow):
         """清除所有建议"""
         try:
             self.suggestion_buttons.clear()
+            self.sections.clear()
             self.current_selected_index = -1
+            self.loading_label.hide()
 
             logging.debug("清除所有建议")
             # 获取布局中的所有项目
@@ -383,6 +581,15 @@ class MainInterface(QMainWindow):
         """使用选中的建议替换原文本"""
         try:
             logging.info(f"用户选择了建议: {suggestion}")
+            recorder = getattr(self.main_app, "trace_recorder", None)
+            if recorder:
+                texts = [btn.text() for btn in self.suggestion_buttons]
+                recorder.record_pick(texts.index(suggestion) if suggestion in texts else -1)
+            on_picked = getattr(self.main_app, "on_suggestion_picked", None)
+            if on_picked:
+                section = next((name for name, s in self.sections.items()
+                                if suggestion in [btn.text() for btn in s["buttons"]]), None)
+                on_picked(section)
             pyperclip.copy(suggestion)
             self.show_status("已复制到剪贴板")
             logging.info("已复制到剪贴板")
@@ -406,13 +613,14 @@ class MainInterface(QMainWindow):
             level = logging.ERROR if error else logging.INFO
             logging.log(level, f"状态更新: {message}")
 
-            self.adjustSize()
+            self.schedule_adjust_size()
         except Exception as e:
             logging.error(f"更新状态时出错: {str(e)}")
             raise
 
     def show_window(self):
-        if not self.window_visible:
+        # 通过关闭按钮或Esc隐藏时不会经过closeEvent，以实际可见状态为准
+        if not self.isVisible():
             self.show()
             self.window_visible = True
         else:
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+pytest.importorskip("openai")
+
+from Advisors.BatchingAdvisor import BatchingAdvisor
+
+
+class FakeAdvisor:
+    max_suggestions = 3
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+        self.single_calls = []
+
+    def build_prompt(self, text):
+        return f"润色：{text}"
+
+    def complete(self, prompt, max_tokens=None):
+        self.prompts.append(prompt)
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply
+
+    def finalize(self, text, lines):
+        return lines[:self.max_suggestions]
+
+    def get_text_suggestions(self, text):
+        self.single_calls.append(text)
+        return [f"单独:{text}"]
+
+
+def run_batch(advisor, texts):
+    results = {}
+
+    def worker(text):
+        results[text] = advisor.get_text_suggestions(text)
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_parse_code_fenced_json():
+    content = '```json\n{"1": ["甲", " ", "乙"], "2": "丙\\n丁"}\n```'
+    assert BatchingAdvisor.parse_batch_response(content) == {"1": ["甲", "乙"], "2": ["丙", "丁"]}
+
+
+def test_parse_skips_malformed_items():
+    content = '{"1": ["甲"], "2": 3, "3": [], "4": {"text": "乙"}}'
+    assert BatchingAdvisor.parse_batch_response(content) == {"1": ["甲"]}
+
+
+@pytest.mark.parametrize("content", ["没有JSON", '["甲", "乙"]', '{"1": ["甲"]'])
+def test_parse_rejects_non_dict_replies(content):
+    with pytest.raises(ValueError):
+        BatchingAdvisor.parse_batch_response(content)
+
+
+def test_batch_answers_each_request_once():
+    inner = FakeAdvisor('{"1": ["一"], "2": ["二"]}')
+    advisor = BatchingAdvisor(inner, window_ms=5000, max_batch=2)
+    results = run_batch(advisor, ["甲", "乙"])
+    assert len(inner.prompts) == 1
+    assert sorted(results.values()) == [["一"], ["二"]]
+    assert inner.single_calls == []
+    assert advisor.get_stats()["batched_requests"] == 2
+
+
+def test_missing_ids_fall_back_to_single_calls():
+    inner = FakeAdvisor('{"1": ["一"]}')
+    advisor = BatchingAdvisor(inner, window_ms=5000, max_batch=2)
+    results = run_batch(advisor, ["甲", "乙"])
+    assert len(inner.single_calls) == 1
+    missing = inner.single_calls[0]
+    assert results[missing] == [f"单独:{missing}"]
+
+
+def test_failed_batch_falls_back_to_single_calls():
+    inner = FakeAdvisor(ValueError("bad gateway"))
+    advisor = BatchingAdvisor(inner, window_ms=5000, max_batch=2)
+    results = run_batch(advisor, ["甲", "乙"])
+    assert sorted(inner.single_calls) == ["乙", "甲"]
+    assert results == {"甲": ["单独:甲"], "乙": ["单独:乙"]}
+
+
+def test_long_text_bypasses_batching():
+    inner = FakeAdvisor('{}')
+    advisor = BatchingAdvisor(inner, window_ms=5000, max_batch=2, max_chars=3)
+    assert advisor.get_text_suggestions("很长的一段文本") == ["单独:很长的一段文本"]
+    assert inner.prompts == []
@@ -0,0 +1,27 @@
+from configparser import ConfigParser
+
+from configurable.config import ConfigManager, DEFAULT_CONFIG, CONFIG_FILE, legacy_prompt
+
+
+def load_config(tmp_path, monkeypatch, values):
+    monkeypatch.chdir(tmp_path)
+    parser = ConfigParser()
+    parser.read_dict(values)
+    with open(CONFIG_FILE, "w") as f:
+        parser.write(f)
+    monkeypatch.setattr(ConfigManager, "_instance", None)
+    return ConfigManager()
+
+
+def test_untouched_legacy_default_prompts_get_count_placeholder(tmp_path, monkeypatch):
+    config = load_config(tmp_path, monkeypatch, {
+        "settings": {"prompt": legacy_prompt(DEFAULT_CONFIG["settings"]["prompt"])},
+        "profile.formal": {"prompt": legacy_prompt(DEFAULT_CONFIG["profile.formal"]["prompt"])},
+    })
+    assert config.get("settings", "prompt") == DEFAULT_CONFIG["settings"]["prompt"]
+    assert "<count>" in config.get("profile.formal", "prompt")
+
+
+def test_custom_prompts_are_left_alone(tmp_path, monkeypatch):
+    config = load_config(tmp_path, monkeypatch, {"settings": {"prompt": "请给出三种改写：<text>"}})
+    assert config.get("settings", "prompt") == "请给出三种改写：<text>"
@@ -0,0 +1,59 @@
+import pytest
+
+from prefilter import PreFilter, API, LOCAL, SKIP
+
+
+@pytest.mark.parametrize("text", [
+    "return the form by Friday",
+    "class starts at nine",
+    "Please note the following;",
+    "We need a == b check in prose",
+    "i think if x(a): maybe",
+    "会议改到周五（下午三点）",
+    "We met (again); it went well.",
+    "He said it (quietly); she left (angrily).",
+    "Bring: pens (blue); paper (A4); tape.",
+    "Bring pens;\nBring paper;",
+    "/usr/bin is a dir",
+    "~/notes has my draft",
+])
+def test_prose_is_not_skipped_as_code(text):
+    _, decision = PreFilter().check(text)
+    assert decision.action == API
+
+
+@pytest.mark.parametrize("text", [
+    "```\nprint(1)\n```",
+    "def add(a, b):\n    return a + b;",
+    "int main() {\n    return 0;\n}",
+    "const total = items.map((x) => x.price);",
+])
+def test_code_is_skipped(text):
+    _, decision = PreFilter().check(text)
+    assert decision.action == SKIP
+    assert decision.reason.startswith("code")
+
+
+
+def test_cache_hits_count_as_avoided_only_once_used():
+    prefilter = PreFilter(rules=[], lookup=lambda text: ["缓存的建议"])
+    _, decision = prefilter.check("需要润色的一句话")
+    assert decision.action == LOCAL
+    assert decision.suggestions == ["缓存的建议"]
+    assert prefilter.avoided == 0
+
+    prefilter.record_local()
+    assert prefilter.avoided == 1
+    assert prefilter.get_stats()[LOCAL] == 1
+
+
+@pytest.mark.parametrize("text", [
+    "/usr/local/bin/python3",
+    "~/projects/demo/main.py",
+    "./scripts/run.sh",
+    "C:\\Program Files\\App\\app.exe",
+])
+def test_paths_are_skipped(text):
+    _, decision = PreFilter().check(text)
+    assert decision.action == SKIP
+    assert decision.reason.startswith("path")
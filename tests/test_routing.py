@@ -0,0 +1,66 @@
+from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.RoutingAdvisor import LATENCY_PROBE_EVERY, Route, RoutingAdvisor
+
+
+class NamedAdvisor(AdvisorInterface):
+    def __init__(self, name):
+        self.name = name
+
+    def get_text_suggestions(self, text):
+        return [self.name]
+
+
+def features(tokens=10, language="zh", code=False):
+    return {"tokens": tokens, "language": language, "code": code}
+
+
+def test_token_bounds():
+    route = Route("short", NamedAdvisor("short"), min_tokens=5, max_tokens=20)
+    assert not route.matches(features(tokens=4))
+    assert route.matches(features(tokens=5))
+    assert route.matches(features(tokens=20))
+    assert not route.matches(features(tokens=21))
+    # max_tokens为0表示不限长度
+    assert Route("any", NamedAdvisor("any"), min_tokens=5).matches(features(tokens=10000))
+
+
+def test_languages_and_code():
+    english = Route("en", NamedAdvisor("en"), languages=["en", " "])
+    assert english.matches(features(language="en"))
+    assert not english.matches(features(language="zh"))
+
+    code_only = Route("code", NamedAdvisor("code"), code="yes")
+    assert code_only.matches(features(code=True))
+    assert not code_only.matches(features(code=False))
+
+    prose_only = Route("prose", NamedAdvisor("prose"), code="no")
+    assert prose_only.matches(features(code=False))
+    assert not prose_only.matches(features(code=True))
+
+
+def test_slow_route_is_skipped_but_probed_periodically():
+    route = Route("fast", NamedAdvisor("fast"), max_latency_ms=100)
+    route.stats.record(0.05, True)
+    assert route.matches(features())
+
+    route.stats.record(2.0, True)
+    results = [route.matches(features()) for _ in range(LATENCY_PROBE_EVERY * 3)]
+    assert results.count(True) == 3
+    assert all(results[i] == ((i + 1) % LATENCY_PROBE_EVERY == 0) for i in range(len(results)))
+    assert route.skipped == LATENCY_PROBE_EVERY * 3
+
+    # 延迟恢复后不再跳过
+    route.stats.ewma_latency = 0.05
+    assert route.matches(features())
+    assert route.skipped == LATENCY_PROBE_EVERY * 3
+
+
+def test_first_matching_route_wins_and_default_catches_rest():
+    router = RoutingAdvisor(
+        [Route("code", NamedAdvisor("code"), code="yes"), Route("en", NamedAdvisor("en"), languages=["en"])],
+        Route("default", NamedAdvisor("default")),
+    )
+    assert router.get_text_suggestions("if (a == b) { return; }") == ["code"]
+    assert router.get_text_suggestions("Please polish this sentence.") == ["en"]
+    assert router.get_text_suggestions("请帮我润色这句话") == ["default"]
+    assert router.get_stats()["routes"]["en"]["calls"] == 1
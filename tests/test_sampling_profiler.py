@@ -0,0 +1,37 @@
+import os
+import time
+
+from sampling_profiler import SamplingProfiler
+
+
+def test_stop_writes_collapsed_and_speedscope(tmp_path):
+    profiler = SamplingProfiler(interval_ms=1, output_dir=str(tmp_path), max_duration_sec=0)
+    profiler.start()
+    time.sleep(0.05)
+    paths = profiler.stop()
+
+    assert not profiler.running
+    assert sorted(os.path.basename(p).split(".", 1)[1] for p in paths) == ["collapsed.txt", "speedscope.json"]
+
+
+def test_rapid_toggling_does_not_leak_sampler_threads(tmp_path):
+    profiler = SamplingProfiler(interval_ms=1, output_dir=str(tmp_path), max_duration_sec=0)
+    for _ in range(20):
+        profiler.toggle()
+    profiler.stop()
+    time.sleep(0.02)
+    assert not profiler.running
+    assert profiler.stop() == []
+
+
+def test_auto_stop_racing_with_stop(tmp_path):
+    profiler = SamplingProfiler(interval_ms=1, output_dir=str(tmp_path), max_duration_sec=0.01)
+    profiler.start()
+    time.sleep(0.012)
+    profiler.stop()
+    time.sleep(0.05)
+
+    assert not profiler.running
+    profiler.start()
+    assert profiler.running
+    assert profiler.stop()
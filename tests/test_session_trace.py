@@ -0,0 +1,46 @@
+from session_trace import TraceRecorder, load_trace, press_schedule, synthesize_text, text_digest
+
+
+def test_sessions_appended_to_one_file_do_not_overlap():
+    events = [
+        {"event": "start", "wall_time": 100.0, "t": 0},
+        {"event": "press", "t": 1.0, "id": "a"},
+        {"event": "press", "t": 2.0, "id": "b"},
+        {"event": "start", "wall_time": 110.0, "t": 0},
+        {"event": "press", "t": 0.5, "id": "c"},
+    ]
+    schedule = press_schedule(events)
+    assert [(at, event["id"]) for at, event in schedule] == [(1.0, "a"), (2.0, "b"), (10.5, "c")]
+
+
+def test_idle_time_between_sessions_is_capped():
+    events = [
+        {"event": "start", "wall_time": 100.0, "t": 0},
+        {"event": "press", "t": 1.0, "id": "a"},
+        {"event": "start", "wall_time": 90000.0, "t": 0},
+        {"event": "press", "t": 0.5, "id": "b"},
+    ]
+    assert [at for at, _ in press_schedule(events, max_gap=5)] == [1.0, 6.5]
+
+
+def test_synthesized_text_differs_per_record_but_keeps_length():
+    first = synthesize_text({"id": "abc123", "chars": 30, "language": "zh"})
+    second = synthesize_text({"id": "def456", "chars": 30, "language": "zh"})
+    assert first != second
+    assert len(first) == len(second) == 30
+    assert synthesize_text({"id": "abc123", "chars": 30, "language": "zh"}) == first
+
+
+def test_redacted_ids_are_salted_per_trace(tmp_path):
+    ids = []
+    for name in ("a.jsonl", "b.jsonl"):
+        recorder = TraceRecorder(str(tmp_path / name))
+        recorder.record_press("谢谢")
+        recorder.record_press("谢谢")
+        recorder.close()
+        start, first, second = load_trace(str(tmp_path / name))
+        assert first["id"] == second["id"] == text_digest("谢谢", start["salt"])
+        assert "text" not in first
+        ids.append(first["id"])
+    assert ids[0] != ids[1]
+    assert text_digest("谢谢") not in ids
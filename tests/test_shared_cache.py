@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Advisors.AdvisorInterface import AdvisorInterface
+from Advisors.SharedCacheAdvisor import SharedCacheAdvisor
+from Advisors.SharedStores import SharedStore, SQLiteStore
+
+
+class EchoAdvisor(AdvisorInterface):
+    def __init__(self):
+        self.calls = 0
+
+    def get_text_suggestions(self, text):
+        self.calls += 1
+        return [f"{text}!"]
+
+
+class SlowStore(SharedStore):
+    """每次查询耗时略短于超时，但串行执行，并发时后面的请求会排队"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            time.sleep(self.latency)
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+
+def create_shared(store, workers=4, timeout_ms=80):
+    return SharedCacheAdvisor(EchoAdvisor(), store, ThreadPoolExecutor(workers), ThreadPoolExecutor(1),
+                              "test", timeout_ms=timeout_ms)
+
+
+def test_second_lookup_hits_shared_store(tmp_path):
+    advisor = create_shared(SQLiteStore(str(tmp_path / "shared.db")))
+    assert advisor.get_text_suggestions("你好") == ["你好!"]
+    advisor.writers.shutdown(wait=True)
+    advisor.writers = ThreadPoolExecutor(1)
+
+    assert advisor.get_text_suggestions("你好 ") == ["你好!"]
+    assert advisor.advisor.calls == 1
+    assert advisor.get_stats()["shared_hits"] == 1
+
+
+def test_queue_wait_does_not_disable_shared_tier():
+    advisor = create_shared(SlowStore(0.05), workers=1, timeout_ms=80)
+    threads = [threading.Thread(target=advisor.get_text_suggestions, args=(f"文本{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = advisor.get_stats()
+    assert stats["shared_timeouts"] > 0
+    assert stats["shared_errors"] == 0
+    assert time.monotonic() >= advisor._disabled_until
+
+
+def test_request_finishing_after_reload_still_returns_suggestions(tmp_path):
+    advisor = create_shared(SQLiteStore(str(tmp_path / "shared.db")))
+    advisor.readers.shutdown(wait=False)
+    advisor.writers.shutdown(wait=False)
+
+    assert advisor.get_text_suggestions("你好") == ["你好!"]
@@ -0,0 +1,80 @@
+import pytest
+
+from Advisors.SuggestionRanker import clean_line, rank_suggestions
+
+
+def test_rewrites_starting_with_polite_words_are_kept():
+    lines = ["好的，我这就去处理", "好的，我立刻着手处理", "好的，马上为您处理"]
+    assert rank_suggestions("好的，我马上处理", lines) == lines
+
+
+def test_english_rewrites_starting_with_of_course_are_kept():
+    lines = [
+        "Of course, I'd be glad to help.",
+        "Certainly, I can assist with that.",
+        "Surely I can lend a hand.",
+        "I would be delighted to help.",
+    ]
+    assert len(rank_suggestions("of course I can help", lines)) == 3
+
+
+def test_first_line_preamble_is_dropped():
+    lines = ["以下是三种改写：", "我们明天再讨论这个问题", "这个问题留到明天讨论", "明天再议此事"]
+    assert rank_suggestions("这个问题明天再说", lines) == lines[1:]
+
+
+def test_colon_ending_rewrite_after_first_line_is_kept():
+    lines = ["Please note the following:", "Kindly note the following:"]
+    result = rank_suggestions("Note the following:", lines)
+    assert "Kindly note the following:" in result
+
+
+def test_echo_and_near_duplicates_are_removed():
+    lines = ["天气很好", "今天天气不错", "今天天气不错。", "今日天气晴好"]
+    assert rank_suggestions("天气很好", lines) == ["今天天气不错", "今日天气晴好"]
+
+
+def test_list_markers_and_quotes_are_cleaned():
+    assert clean_line("1. “好的方案”") == "好的方案"
+    assert clean_line("- option") == "option"
+
+
+def test_limit_is_applied():
+    lines = ["甲方案可行", "乙计划更好", "丙思路很新", "丁办法最稳"]
+    assert len(rank_suggestions("这个方法可以", lines, limit=2)) == 2
+
+
+@pytest.mark.parametrize("line", [
+    "3.5 billion people use it",
+    "方案已经确定，请执行",
+    "Option pricing is complex",
+    "2024: a great year",
+    "10、20两个数字",
+])
+def test_text_that_only_looks_like_a_marker_is_kept(line):
+    assert clean_line(line) == line
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("1. 第一个选项", "第一个选项"),
+    ("2、第二个选项", "第二个选项"),
+    ("3) third option", "third option"),
+    ("(4) 第四个", "第四个"),
+    ("一、第一条", "第一条"),
+    ("选项1：改写后的句子", "改写后的句子"),
+    ("Option 2: a rewrite", "a rewrite"),
+    ("* bullet", "bullet"),
+])
+def test_list_markers_are_removed(line, expected):
+    assert clean_line(line) == expected
+
+
+def test_explanation_lines_are_dropped():
+    lines = ["会议推迟到周五", "注：以上改写保持了原意"]
+    assert rank_suggestions("会议改到周五", lines) == ["会议推迟到周五"]
+
+
+def test_rewrites_of_a_note_keep_their_prefix():
+    lines = ["Note: the office closes at 5 pm.", "Note: we close the office at 5 pm."]
+    result = rank_suggestions("Note: the office will close at 5.", lines)
+    assert sorted(result) == sorted(lines)